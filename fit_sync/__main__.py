@@ -4,14 +4,19 @@ Command-line interface for fit_sync.
 """
 
 import argparse
+import datetime
 import json
 import logging
 import os
 import sys
-from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
-from .sync import SyncManager
+# orjson is optional; it parses bytes directly and is faster than the stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 def setup_logging(verbose: bool = False):
     """Set up logging configuration."""
@@ -22,53 +27,138 @@ def setup_logging(verbose: bool = False):
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
-def main():
-    """Main entry point for the application."""
-    parser = argparse.ArgumentParser(description='Sync fitness activities between platforms')
-    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+def _format_activities(activities: List[Dict], account: str) -> str:
+    """
+    Format an activity listing for display.
     
-    # Auth command
-    auth_parser = subparsers.add_parser('auth', help='Authenticate with fitness platforms')
+    The whole table is built as one string so it can be written in a single call.
     
-    # List command
-    list_parser = subparsers.add_parser('list', help='List activities')
-    list_parser.add_argument('--account', help='Account to list activities from')
-    list_parser.add_argument('--limit', type=int, default=10, help='Maximum number of activities to display')
-    list_parser.add_argument('--activity-type', help='Filter by activity type')
-    list_parser.add_argument('--start-date', help='Only show activities after date (YYYY-MM-DD)')
-    list_parser.add_argument('--end-date', help='Only show activities before date (YYYY-MM-DD)')
+    Args:
+        activities: Activity dictionaries to display
+        account: Account the activities were listed from
+        
+    Returns:
+        Formatted listing, including header and footer lines
+    """
+    separator = "-" * 80
+    lines = [f"\nActivities from {account}:", separator]
+    lines.extend(
+        f"{i+1}. {activity.get('startTime', 'Unknown')} - "
+        f"{activity.get('activityType', 'Unknown')} - "
+        f"{activity.get('duration', 'Unknown')} - "
+        f"{activity.get('distance', 'Unknown')} - "
+        f"ID: {activity.get('id', 'Unknown')}"
+        for i, activity in enumerate(activities)
+    )
+    lines.append(separator)
+    return "\n".join(lines) + "\n"
+
+def _print_activities(activities: List[Dict], account: str, footer: str = ""):
+    """
+    Print an activity listing to stdout with a single write.
     
-    # Download command
-    download_parser = subparsers.add_parser('download', help='Download activity FIT files')
-    download_parser.add_argument('--account', required=True, help='Account to download activities from')
-    download_parser.add_argument('--index', type=int, help='Index of the activity to download (from list command)')
-    download_parser.add_argument('--id', help='ID of the activity to download (advanced users)')
-    download_parser.add_argument('--output-dir', help='Directory to save downloaded files')
-    download_parser.add_argument('--activity-type', help='Filter by activity type')
-    download_parser.add_argument('--start-date', help='Only consider activities after date (YYYY-MM-DD)')
-    download_parser.add_argument('--end-date', help='Only consider activities before date (YYYY-MM-DD)')
-    download_parser.add_argument('--limit', type=int, default=10, help='Maximum number of activities to consider')
+    Args:
+        activities: Activity dictionaries to display
+        account: Account the activities were listed from
+        footer: Extra text to append after the listing (optional)
+    """
+    sys.stdout.write(_format_activities(activities, account) + footer)
+
+def _iso_date(value: str) -> str:
+    """
+    Validate a YYYY-MM-DD date argument.
     
-    # Sync command
-    sync_parser = subparsers.add_parser('sync', help='Sync activities between platforms')
-    sync_parser.add_argument('--source', help='Override source account from config')
-    sync_parser.add_argument('--destination', help='Override destination account from config')
-    sync_parser.add_argument('--dry-run', action='store_true', help='Preview sync operations without making changes')
-    sync_parser.add_argument('--force', action='store_true', help='Force sync even for activities that appear to be duplicates')
-    sync_parser.add_argument('--activity-type', help='Comma-separated list of activity types to sync')
-    sync_parser.add_argument('--start-date', help='Only sync activities after date (YYYY-MM-DD)')
-    sync_parser.add_argument('--end-date', help='Only sync activities before date (YYYY-MM-DD)')
+    Args:
+        value: Date string from the command line
+        
+    Returns:
+        The date in YYYY-MM-DD form
+        
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a valid date
+    """
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}' (expected YYYY-MM-DD)")
+
+def _add_list_arguments(parser: argparse.ArgumentParser):
+    """Add arguments for the list command."""
+    parser.add_argument('--account', help='Account to list activities from')
+    parser.add_argument('--limit', type=int, default=10, help='Maximum number of activities to display')
+    parser.add_argument('--activity-type', help='Filter by activity type')
+    parser.add_argument('--start-date', type=_iso_date, help='Only show activities after date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=_iso_date, help='Only show activities before date (YYYY-MM-DD)')
+
+def _add_download_arguments(parser: argparse.ArgumentParser):
+    """Add arguments for the download command."""
+    parser.add_argument('--account', required=True, help='Account to download activities from')
+    parser.add_argument('--index', type=int, help='Index of the activity to download (from list command)')
+    parser.add_argument('--id', help='ID of the activity to download (advanced users)')
+    parser.add_argument('--output-dir', help='Directory to save downloaded files')
+    parser.add_argument('--activity-type', help='Filter by activity type')
+    parser.add_argument('--start-date', type=_iso_date, help='Only consider activities after date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=_iso_date, help='Only consider activities before date (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=10, help='Maximum number of activities to consider')
+
+def _add_sync_arguments(parser: argparse.ArgumentParser):
+    """Add arguments for the sync command."""
+    parser.add_argument('--source', help='Override source account from config')
+    parser.add_argument('--destination', help='Override destination account from config')
+    parser.add_argument('--dry-run', action='store_true', help='Preview sync operations without making changes')
+    parser.add_argument('--force', action='store_true', help='Force sync even for activities that appear to be duplicates')
+    parser.add_argument('--activity-type', help='Comma-separated list of activity types to sync')
+    parser.add_argument('--start-date', type=_iso_date, help='Only sync activities after date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=_iso_date, help='Only sync activities before date (YYYY-MM-DD)')
+
+def _add_clear_cache_arguments(parser: argparse.ArgumentParser):
+    """Add arguments for the clear-cache command."""
+    parser.add_argument('--auth-only', action='store_true', help='Only clear authentication cache')
+    parser.add_argument('--activities-only', action='store_true', help='Only clear activities cache')
+
+# Subcommand name -> (help text, argument builder)
+COMMANDS = {
+    'auth': ('Authenticate with fitness platforms', None),
+    'list': ('List activities', _add_list_arguments),
+    'download': ('Download activity FIT files', _add_download_arguments),
+    'sync': ('Sync activities between platforms', _add_sync_arguments),
+    'clear-cache': ('Clear cached data', _add_clear_cache_arguments),
+}
+
+def build_parser(command: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Build the argument parser.
     
-    # Clear cache command
-    clear_cache_parser = subparsers.add_parser('clear-cache', help='Clear cached data')
-    clear_cache_parser.add_argument('--auth-only', action='store_true', help='Only clear authentication cache')
-    clear_cache_parser.add_argument('--activities-only', action='store_true', help='Only clear activities cache')
+    Args:
+        command: Only build the subparser for this command (optional).
+                 All subparsers are built when omitted, e.g. for help output.
+        
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(description='Sync fitness activities between platforms')
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
     
-    # Common options
-    for subparser in [auth_parser, list_parser, download_parser, sync_parser, clear_cache_parser]:
+    for name, (help_text, add_arguments) in COMMANDS.items():
+        if command is not None and name != command:
+            continue
+        subparser = subparsers.add_parser(name, help=help_text)
+        if add_arguments:
+            add_arguments(subparser)
+        
+        # Common options
         subparser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
         subparser.add_argument('--config', help='Specify an alternative configuration file')
     
+    return parser
+
+def main():
+    """Main entry point for the application."""
+    # Only build the subparser for the requested command; fall back to the
+    # full parser for help output and unknown commands
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    parser = build_parser(command if command in COMMANDS else None)
+    
     args = parser.parse_args()
     
     # Ensure a command was specified
@@ -83,21 +173,21 @@ def main():
     # Load configuration
     config_path = args.config or os.path.expanduser('~/.fit_sync/config.json')
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        with open(config_path, 'rb') as f:
+            config = _json_loads(f.read())
     except FileNotFoundError:
         logger.error(f"Configuration file not found at {config_path}")
         logger.error("Please create a configuration file as described in the documentation.")
         sys.exit(1)
-    except json.JSONDecodeError:
+    except ValueError:
+        # json.JSONDecodeError and orjson.JSONDecodeError are both ValueErrors
         logger.error(f"Configuration file at {config_path} is not valid JSON")
         sys.exit(1)
     
-    # Create sync manager
-    sync_manager = SyncManager(config)
-    
     # Execute the requested command
     if args.command == 'auth':
+        from .sync import SyncManager
+        sync_manager = SyncManager(config)
         logger.info("Authenticating with fitness platforms...")
         if sync_manager.authenticate_all():
             logger.info("Authentication successful for all platforms")
@@ -107,6 +197,8 @@ def main():
             sys.exit(1)
     
     elif args.command == 'list':
+        from .sync import SyncManager
+        sync_manager = SyncManager(config)
         account = args.account
         if not account:
             logger.error("Please specify an account with --account")
@@ -135,18 +227,12 @@ def main():
             sys.exit(0)
             
         # Display activities
-        print(f"\nActivities from {account}:")
-        print("-" * 80)
-        for i, activity in enumerate(activities):
-            print(f"{i+1}. {activity.get('startTime', 'Unknown')} - "
-                  f"{activity.get('activityType', 'Unknown')} - "
-                  f"{activity.get('duration', 'Unknown')} - "
-                  f"{activity.get('distance', 'Unknown')} - "
-                  f"ID: {activity.get('id', 'Unknown')}")
-        print("-" * 80)
+        _print_activities(activities, account)
         sys.exit(0)
     
     elif args.command == 'download':
+        from .sync import SyncManager
+        sync_manager = SyncManager(config)
         account = args.account
         if account not in sync_manager.platforms:
             logger.error(f"Account {account} not configured")
@@ -185,16 +271,8 @@ def main():
             
         # If no index provided, display activities and exit
         if args.index is None:
-            print(f"\nActivities from {account}:")
-            print("-" * 80)
-            for i, activity in enumerate(activities):
-                print(f"{i+1}. {activity.get('startTime', 'Unknown')} - "
-                      f"{activity.get('activityType', 'Unknown')} - "
-                      f"{activity.get('duration', 'Unknown')} - "
-                      f"{activity.get('distance', 'Unknown')} - "
-                      f"ID: {activity.get('id', 'Unknown')}")
-            print("-" * 80)
-            print("Use --index <number> to download a specific activity")
+            _print_activities(activities, account,
+                              footer="Use --index <number> to download a specific activity\n")
             sys.exit(0)
             
         # Download the activity at the specified index
@@ -209,7 +287,7 @@ def main():
             # Create a human-readable filename if output directory is specified
             output_filename = None
             if args.output_dir:
-                activity_date = activity.get('startTime', '').split(' ')[0].replace('-', '')
+                activity_date = activity.get('startTime', '').split(' ', 1)[0].replace('-', '')
                 activity_type = activity.get('activityType', 'activity')
                 output_filename = f"{activity_date}_{activity_type}_{args.index}.fit"
             
@@ -232,6 +310,8 @@ def main():
             sys.exit(1)
     
     elif args.command == 'sync':
+        from .sync import SyncManager
+        sync_manager = SyncManager(config)
         # Authenticate with all platforms
         if not sync_manager.authenticate_all():
             logger.error("Authentication failed, cannot sync")
@@ -257,28 +337,32 @@ def main():
         sys.exit(0)
     
     elif args.command == 'clear-cache':
+        # Only the cache directory is needed here, so skip building SyncManager
+        import shutil
+        from pathlib import Path
         cache_dir = Path(config.get('cache', {}).get('directory', '~/.fit_sync/cache')).expanduser()
+        # rmtree already walks the tree with scandir; attempt the delete
+        # directly instead of stat-ing the directory first
         if args.auth_only:
             auth_cache = cache_dir / 'auth'
-            if auth_cache.exists():
-                import shutil
+            try:
                 shutil.rmtree(auth_cache)
                 logger.info(f"Cleared authentication cache at {auth_cache}")
-            else:
+            except FileNotFoundError:
                 logger.info(f"No authentication cache found at {auth_cache}")
         elif args.activities_only:
-            # Clear activities cache from memory
-            sync_manager.clear_activities_cache()
-            logger.info("Cleared activities cache from memory")
+            activities_cache = cache_dir / 'activities'
+            try:
+                shutil.rmtree(activities_cache)
+                logger.info(f"Cleared activities cache at {activities_cache}")
+            except FileNotFoundError:
+                logger.info(f"No activities cache found at {activities_cache}")
         else:
-            if cache_dir.exists():
-                import shutil
+            try:
                 shutil.rmtree(cache_dir)
                 cache_dir.mkdir(parents=True, exist_ok=True)
-                # Also clear activities cache from memory
-                sync_manager.clear_activities_cache()
                 logger.info(f"Cleared all cached data at {cache_dir}")
-            else:
+            except FileNotFoundError:
                 logger.info(f"No cache directory found at {cache_dir}")
         sys.exit(0)
 
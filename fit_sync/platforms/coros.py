@@ -5,105 +5,303 @@ Coros platform implementation for fit_sync.
 import logging
 import os
 import datetime
-import uuid
-import hashlib
-import requests
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import timedelta
 
+# orjson is optional; it works on bytes directly and is faster than the stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
 logger = logging.getLogger(__name__)
 
+# Headers sent with every request on the shared session
+_SESSION_HEADERS = {
+    'accept': 'application/json, text/plain, */*',
+    'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36'
+}
+
+# Activity type -> Coros mode code used by the activity query filter.
+# This would need to be expanded based on Coros activity type codes
+ACTIVITY_MODE_MAP = {
+    'running': '8',
+    'cycling': '15',
+    'swimming': '19',
+    'trail_running': '8',
+    'hiking': '15'
+}
+
+# Coros sportType code -> activity type
+SPORT_TYPE_MAP = {
+    100: 'running',
+    101: 'treadmill',
+    102: 'trail_running',
+    103: 'track_running',
+    108: 'indoor_walk',
+    109: 'walk',
+    110: 'hike',
+    115: 'cycling',
+    119: 'swimming',
+    111: 'mountaineering',
+    # Add more mappings as needed
+}
+
+# Large read size so multi-MB FIT downloads take few Python-level iterations
+_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# (connect, read) timeout in seconds, so a stalled server can't hang a sync
+_REQUEST_TIMEOUT = (5, 30)
+
+_session = None
+_session_lock = threading.Lock()
+
+def _get_session():
+    """
+    Get the HTTP session shared by all Coros platform instances.
+    
+    Sharing one session lets every instance reuse pooled keep-alive
+    connections instead of paying a TLS handshake per instance. Auth
+    headers are therefore passed per request, not set on the session.
+    
+    Returns:
+        Shared requests.Session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            # requests is imported here so that importing this module stays cheap
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            session = requests.Session()
+            # Pool connections to the API hosts and retry transient gateway errors.
+            # Once retries run out the last response is returned rather than raised
+            # as a RetryError, so callers still see and log the real status code.
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=32,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[500, 502, 503, 504],
+                    raise_on_status=False
+                )
+            )
+            session.mount('https://', adapter)
+            session.headers.update(_SESSION_HEADERS)
+            _session = session
+        return _session
+
 class CorosPlatform:
     """Base class for Coros platform implementations."""
     
-    def __init__(self, credentials: Dict[str, str], cache_dir: str):
+    # list_activities returns exactly the requested activity types
+    supports_server_activity_type_filter = True
+    
+    # Process-wide token cache: (email, class name) -> (token, user_id, expiry unix timestamp)
+    _token_cache: Dict[Tuple[str, str], Tuple[str, Any, float]] = {}
+    _token_cache_lock = threading.Lock()
+    _token_file_lock = threading.Lock()
+    
+    # Login headers, built once rather than on every authenticate() call.
+    # The session already carries the shared accept/user-agent headers, and
+    # origin/referer stay per request because the session is shared by all
+    # Coros platforms.
+    _AUTH_HEADERS = {
+        'origin': 'https://www.coros.com',
+        'referer': 'https://www.coros.com/'
+    }
+    
+    def __init__(self, credentials: Dict[str, str], cache_dir: Union[str, Path], session=None):
         """
         Initialize the Coros platform.
         
         Args:
             credentials: Dictionary containing 'email' and 'password'
-            cache_dir: Directory to store cached data
+            cache_dir: Directory to store cached data (str or Path)
+            session: HTTP session to use instead of the shared one (e.g. in tests)
         """
         self.email = credentials.get('email')
         self.password = credentials.get('password')
-        self.cache_dir = Path(cache_dir)
-        self.session = requests.Session()
+        self.cache_dir = Path(cache_dir).expanduser()
+        
+        # The login API expects an MD5 of the password; it never changes, so hash it once
+        import hashlib
+        self._pwd_md5 = hashlib.md5(self.password.encode()).hexdigest() if self.password else None
+        self.session = session if session is not None else _get_session()
         self.token = None
+        self._token_expiry = None
+        self._auth_headers = {}
         self.user_id = None
+        self._auth_lock = threading.Lock()
         self.base_url = "https://api.coros.com"
         self.web_url = "https://www.coros.com"
-        self.token_cache_file = self.cache_dir / "coros_token.json"
+        self.token_cache_file = self.cache_dir / "auth" / "coros.json"
         
         # Create cache directory if it doesn't exist
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
-    def _load_cached_token(self) -> bool:
+    def _read_token_file(self) -> Optional[Tuple[str, Any, float]]:
         """
-        Load token from the cache file if it exists and is not expired.
+        Read the token cache file for the current user.
         
         Returns:
-            True if a valid token was loaded, False otherwise
+            Tuple of (token, user_id, expiry unix timestamp), or None if no usable entry exists
         """
         if not self.token_cache_file.exists():
-            return False
+            return None
         
         try:
-            with open(self.token_cache_file, 'r') as f:
-                cache_data = json.load(f)
+            with open(self.token_cache_file, 'rb') as f:
+                cache_data = _json_loads(f.read())
                 
             # Check if token is for current user
-            if cache_data.get('email') != self.email:
-                return False
-                
-            # Check if token is expired
-            expiry_time = datetime.fromisoformat(cache_data.get('expiry_time', '2000-01-01T00:00:00'))
-            if datetime.now() > expiry_time:
-                logger.debug("Cached token has expired")
-                return False
+            if cache_data.get('email') != self.email or not cache_data.get('token'):
+                return None
                 
-            # Load token and user_id
-            self.token = cache_data.get('token')
-            self.user_id = cache_data.get('user_id')
-            
-            if self.token:
-                # Update session headers with token
-                self.session.headers.update({
-                    'Authorization': f"Bearer {self.token}"
-                })
-                logger.info(f"Using cached token for {self.email}")
-                return True
+            expiry_ts = cache_data.get('expiry_ts')
+            if expiry_ts is None:
+                # Cache files written by older versions store an ISO timestamp
+                expiry_ts = datetime.datetime.fromisoformat(
+                    cache_data.get('expiry_time', '2000-01-01T00:00:00')
+                ).timestamp()
+            return cache_data.get('token'), cache_data.get('user_id'), expiry_ts
                 
         except Exception as e:
-            logger.debug(f"Error loading cached token: {str(e)}")
+            logger.debug("Error loading cached token: %s", e)
             
-        return False
+        return None
+        
+    def _load_cached_token(self) -> bool:
+        """
+        Load token from the cache if it exists and is not expired.
+        
+        Tokens are kept in memory per process, so only the first lookup
+        for an account reads the cache file.
+        
+        Returns:
+            True if a valid token was loaded, False otherwise
+        """
+        # Cache entries are per account, so there is nothing to look up without one
+        if not self.email:
+            return False
+        
+        # Fast path: this instance already holds a token that has not expired
+        if self.token and self._token_expiry and time.time() < self._token_expiry:
+            return True
+        
+        key = (self.email, type(self).__name__)
+        with CorosPlatform._token_cache_lock:
+            cached = CorosPlatform._token_cache.get(key)
+            
+        if cached is None:
+            cached = self._read_token_file()
+            if cached is None:
+                return False
+            with CorosPlatform._token_cache_lock:
+                CorosPlatform._token_cache[key] = cached
+        
+        token, user_id, expiry_ts = cached
+        
+        # Check if token is expired
+        if time.time() > expiry_ts:
+            logger.debug("Cached token has expired")
+            with CorosPlatform._token_cache_lock:
+                CorosPlatform._token_cache.pop(key, None)
+            return False
+            
+        # Load token and user_id
+        self.token = token
+        self._token_expiry = expiry_ts
+        self.user_id = user_id
+        
+        self._set_auth_headers()
+        logger.info(f"Using cached token for {self.email}")
+        return True
+        
+    def _set_auth_headers(self):
+        """Build the per-request auth headers for the current token."""
+        self._auth_headers = {'Authorization': f"Bearer {self.token}"}
         
     def _save_token_to_cache(self, token_data: Dict[str, Any]):
         """
-        Save token and user info to cache file.
+        Save token and user info to the in-memory cache and cache file.
         
         Args:
             token_data: Dictionary containing token and user info
         """
+        # The API does not report a token lifetime, so assume an optimistic one;
+        # a 401 response invalidates the token early (see CorosCNPlatform._request)
+        expiry_ts = time.time() + timedelta(days=7).total_seconds()
+        self._token_expiry = expiry_ts
+        with CorosPlatform._token_cache_lock:
+            CorosPlatform._token_cache[(self.email, type(self).__name__)] = (
+                self.token, self.user_id, expiry_ts
+            )
+        
         try:
-            # Set token expiry to 12 hours from now (conservative estimate)
             cache_data = {
                 'email': self.email,
                 'token': self.token,
                 'user_id': self.user_id,
-                'expiry_time': (datetime.now() + timedelta(hours=12)).isoformat(),
+                'expiry_ts': expiry_ts,
                 'platform': self.__class__.__name__
             }
             
-            with open(self.token_cache_file, 'w') as f:
-                json.dump(cache_data, f)
+            # Write to a temporary file and swap it in, so a crash mid-write
+            # never leaves a corrupt cache file behind
+            tmp_file = self.token_cache_file.with_suffix('.json.tmp')
+            with CorosPlatform._token_file_lock:
+                self.token_cache_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_file, 'wb') as f:
+                    f.write(_json_dumps(cache_data))
+                os.replace(tmp_file, self.token_cache_file)
                 
-            logger.debug(f"Saved token to cache for {self.email}")
+            logger.debug("Saved token to cache for %s", self.email)
             
         except Exception as e:
-            logger.debug(f"Error saving token to cache: {str(e)}")
+            logger.debug("Error saving token to cache: %s", e)
+    
+    def _invalidate_token(self):
+        """Drop the current token from this instance, the in-memory cache and the cache file."""
+        self.token = None
+        self._token_expiry = None
+        self._auth_headers = {}
+        with CorosPlatform._token_cache_lock:
+            CorosPlatform._token_cache.pop((self.email, type(self).__name__), None)
+        with CorosPlatform._token_file_lock:
+            self.token_cache_file.unlink(missing_ok=True)
+    
+    def _ensure_token(self, stale_token: Optional[str] = None) -> bool:
+        """
+        Make sure a token is available, authenticating at most once across threads.
+        
+        Args:
+            stale_token: Token the server just rejected (optional). It is only
+                         invalidated if no other thread has replaced it already.
+            
+        Returns:
+            True if a token is available, False if authentication failed
+        """
+        with self._auth_lock:
+            if stale_token is not None and self.token == stale_token:
+                self._invalidate_token()
+            if self.token:
+                return True
+            return self.authenticate()
     
     def authenticate(self) -> bool:
         """
@@ -114,43 +312,37 @@ class CorosPlatform:
         """
         logger.info(f"Authenticating with Coros as {self.email}")
         
-        # Try to load token from cache first
-        if self._load_cached_token():
-            return True
-            
+        # Fail fast before touching the token cache
         if not self.email or not self.password:
             logger.error("Email or password missing")
             return False
-        
-        # Prepare headers
-        headers = {
-            'accept': 'application/json, text/plain, */*',
-            'content-type': 'application/json',
-            'origin': self.web_url,
-            'referer': self.web_url + '/',
-            'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36'
-        }
+            
+        # Try to load token from cache first
+        if self._load_cached_token():
+            return True
         
         # Prepare login data
         login_data = {
             "account": self.email,
             "accountType": 2,  # Email login type
-            "pwd": hashlib.md5(self.password.encode()).hexdigest()
+            "pwd": self._pwd_md5
         }
         
         try:
             # Make login request
             login_url = f"{self.base_url}/account/login"
-            logger.debug(f"Sending login request to {login_url}")
+            logger.debug("Sending login request to %s", login_url)
+            # json= sets the content type
             response = self.session.post(
                 login_url,
-                headers=headers,
-                json=login_data
+                headers=self._AUTH_HEADERS,
+                json=login_data,
+                timeout=_REQUEST_TIMEOUT
             )
             
             # Check response
             if response.status_code == 200:
-                response_data = response.json()
+                response_data = _json_loads(response.content)
                 
                 if response_data.get('code') == 200:
                     # Extract and store auth token
@@ -158,10 +350,8 @@ class CorosPlatform:
                     if self.token:
                         logger.info("Coros authentication successful")
                         
-                        # Update session headers with token for subsequent requests
-                        self.session.headers.update({
-                            'Authorization': f"Bearer {self.token}"
-                        })
+                        # Auth headers for subsequent requests
+                        self._set_auth_headers()
                         
                         # Get user ID if available
                         self.user_id = response_data.get('data', {}).get('userId')
@@ -209,30 +399,46 @@ class CorosPlatform:
         
         # Apply activity_type filter if specified
         if activity_type:
-            filtered_types = activity_type.split(',')
+            filtered_types = frozenset(activity_type.split(','))
             activity_types = [t for t in activity_types if t in filtered_types]
+            if not activity_types:
+                return []
+            
+        now = datetime.datetime.now()
+        today = now.date()
+        types_len = len(activity_types)
+        step = timedelta(days=3)  # Every 3 days to make it different from Garmin
+        # One RNG call for all IDs rather than a uuid4() per activity; a
+        # negative limit yields no activities rather than an os.urandom error
+        rand_bytes = os.urandom(4 * max(limit, 0))
+        
+        # Activity i falls on today - 3*i days, so the date filters map to a
+        # contiguous index range and no per-activity date check is needed
+        start_i, stop_i = 0, limit
+        try:
+            if end_date:
+                days_after_end = (today - datetime.date.fromisoformat(end_date)).days
+                start_i = max(start_i, -(-days_after_end // 3))  # ceil division
+            if start_date:
+                days_since_start = (today - datetime.date.fromisoformat(start_date)).days
+                stop_i = min(stop_i, days_since_start // 3 + 1)
+        except ValueError:
+            logger.error(f"Invalid date filter (expected YYYY-MM-DD): start={start_date!r}, end={end_date!r}")
+            return []
             
         # Create sample activities
-        for i in range(limit):
+        for i in range(start_i, stop_i):
             # Generate a date between 2023-01-01 and today
-            days_ago = i * 3  # Every 3 days to make it different from Garmin
-            activity_date = datetime.datetime.now() - datetime.timedelta(days=days_ago)
-            activity_date_str = activity_date.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Check date filters
-            if start_date and activity_date.strftime("%Y-%m-%d") < start_date:
-                continue
-                
-            if end_date and activity_date.strftime("%Y-%m-%d") > end_date:
-                continue
+            activity_date = now - step * i
             
             activity = {
-                "id": f"COROS_{uuid.uuid4().hex[:8]}",  # Make Coros IDs distinct
-                "startTime": activity_date_str,
-                "activityType": activity_types[i % len(activity_types)],
-                "duration": f"00:{45 + i * 3:02d}:{i*2:02d}",  # Format as HH:MM:SS
-                "distance": f"{8.0 + i * 0.8:.1f} km",
-                "elevationGain": f"{i * 25} m",
+                "id": f"COROS_{rand_bytes[i * 4:(i + 1) * 4].hex()}",  # Make Coros IDs distinct
+                "startTime": activity_date.strftime("%Y-%m-%d %H:%M:%S"),
+                "activityType": activity_types[i % types_len],
+                # %-formatting avoids the __format__ dispatch of f-string format specs
+                "duration": "00:%02d:%02d" % (45 + i * 3, i * 2),  # Format as HH:MM:SS
+                "distance": "%.1f km" % (8.0 + i * 0.8),
+                "elevationGain": "%d m" % (i * 25),
                 "avgHR": 145 + i,
                 "calories": 300 + i * 60
             }
@@ -250,7 +456,7 @@ class CorosPlatform:
         Returns:
             Path to the downloaded FIT file, or None if download failed
         """
-        logger.info(f"Downloading activity {activity_id} from Coros")
+        logger.info("Downloading activity %s from Coros", activity_id)
         
         # Create a mock file in the cache directory
         fit_file = self.cache_dir / f"{activity_id}.fit"
@@ -265,23 +471,40 @@ class CorosPlatform:
 class CorosCNPlatform(CorosPlatform):
     """Coros China platform implementation."""
     
-    def __init__(self, credentials: Dict[str, str], cache_dir: str):
-        super().__init__(credentials, cache_dir)
+    # The API filters by mode code, and several activity types share a mode
+    supports_server_activity_type_filter = False
+    
+    _AUTH_HEADERS = {
+        'origin': 'https://t.coros.com',
+        'referer': 'https://t.coros.com/'
+    }
+    
+    # Headers for the training API, built once rather than per request
+    _API_HEADERS = {
+        'origin': 'https://trainingcn.coros.com',
+        'referer': 'https://trainingcn.coros.com/'
+    }
+    _DOWNLOAD_HEADERS = {'accept': 'application/octet-stream', **_API_HEADERS}
+    
+    # Short-lived LRU cache of list_activities results
+    _LIST_CACHE_TTL = 30  # seconds
+    _LIST_CACHE_SIZE = 32
+    
+    def __init__(self, credentials: Dict[str, str], cache_dir: Union[str, Path], session=None):
+        super().__init__(credentials, cache_dir, session)
         self.base_url = "https://teamapi.coros.com"
         self.web_url = "https://t.coros.com"
-        self.token_cache_file = self.cache_dir / "coros_cn_token.json"
+        self.token_cache_file = self.cache_dir / "auth" / "coros_cn.json"
+        self._list_cache = {}  # query -> (monotonic time, activities)
+        self._auth_cookies = {}
     
-    def _hash_password(self, password: str) -> str:
-        """
-        Hash the password with MD5 for COROS CN login.
-        
-        Args:
-            password: Plain text password
-            
-        Returns:
-            MD5 hashed password
-        """
-        return hashlib.md5(password.encode()).hexdigest()
+    def _set_auth_headers(self):
+        """Build the per-request auth headers and cookies for the current token."""
+        self._auth_headers = {'accesstoken': self.token}
+        self._auth_cookies = {
+            'CPL-coros-region': '2',  # China region
+            'CPL-coros-token': self.token
+        }
     
     def authenticate(self) -> bool:
         """
@@ -292,44 +515,40 @@ class CorosCNPlatform(CorosPlatform):
         """
         logger.info(f"Authenticating with Coros CN as {self.email}")
         
-        # Try to load token from cache first
-        if self._load_cached_token():
-            return True
-        
+        # Fail fast before touching the token cache
         if not self.email or not self.password:
             logger.error("Email or password missing")
             return False
         
-        # Prepare headers
-        headers = {
-            'accept': 'application/json, text/plain, */*',
-            'content-type': 'application/json',
-            'origin': self.web_url,
-            'referer': self.web_url + '/',
-            'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36'
-        }
+        # Try to load token from cache first
+        if self._load_cached_token():
+            return True
         
         # Prepare login data
         login_data = {
             "account": self.email,
             "accountType": 2,  # Email login type
-            "pwd": self._hash_password(self.password)
+            "pwd": self._pwd_md5
         }
         
         try:
             # Make login request
             login_url = f"{self.base_url}/account/login"
-            logger.debug(f"Sending login request to {login_url}")
+            logger.debug("Sending login request to %s", login_url)
+            # json= sets the content type
             response = self.session.post(
                 login_url,
-                headers=headers,
-                json=login_data
+                headers=self._AUTH_HEADERS,
+                json=login_data,
+                timeout=_REQUEST_TIMEOUT
             )
             
             # Check response
             if response.status_code == 200:
-                response_data = response.json()
-                logger.debug(f"Response data: {json.dumps(response_data)}")
+                response_data = _json_loads(response.content)
+                # Only log the status fields; the data payload carries the access token
+                logger.debug("Auth result=%s message=%s",
+                             response_data.get('result'), response_data.get('message'))
                 
                 # COROS API uses "result" field with "0000" for success
                 if response_data.get('result') == "0000" and response_data.get('message') == "OK":
@@ -339,10 +558,8 @@ class CorosCNPlatform(CorosPlatform):
                         self.token = access_token
                         logger.info("COROS CN authentication successful")
                         
-                        # Update session headers with token for subsequent requests
-                        self.session.headers.update({
-                            'accesstoken': self.token
-                        })
+                        # Auth headers for subsequent requests
+                        self._set_auth_headers()
                         
                         # Store the user ID for later use
                         self.user_id = response_data.get('data', {}).get('userId')
@@ -369,11 +586,49 @@ class CorosCNPlatform(CorosPlatform):
                 
         except Exception as e:
             logger.error(f"Authentication error: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            # Only walk the stack when the traceback will actually be logged
+            if logger.isEnabledFor(logging.DEBUG):
+                import traceback
+                logger.debug(traceback.format_exc())
             
         return False
         
+    def _request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None, **kwargs):
+        """
+        Send an authenticated request to the Coros CN API.
+        
+        If the server rejects the token with a 401, the token is invalidated,
+        a fresh one is obtained and the request is retried once.
+        
+        Args:
+            method: HTTP method name, e.g. 'get'
+            url: Request URL
+            headers: Extra request headers (optional)
+            **kwargs: Passed through to the session request
+            
+        Returns:
+            The response of the last attempt
+        """
+        send = getattr(self.session, method)
+        kwargs.setdefault('timeout', _REQUEST_TIMEOUT)
+        for attempt in range(2):
+            token = self.token
+            response = send(
+                url,
+                headers={**(headers or {}), **self._auth_headers},
+                cookies=self._auth_cookies,
+                **kwargs
+            )
+            if response.status_code != 401 or attempt:
+                break
+            
+            logger.info("Coros CN token rejected, re-authenticating")
+            response.close()
+            if not self._ensure_token(stale_token=token):
+                break
+            
+        return response
+        
     def list_activities(self, 
                         limit: int = 20, 
                         activity_type: Optional[str] = None,
@@ -393,16 +648,17 @@ class CorosCNPlatform(CorosPlatform):
         """
         logger.info(f"Listing up to {limit} activities from Coros CN")
         
-        if not self.token:
-            if not self.authenticate():
-                logger.error("Failed to authenticate with Coros CN")
-                return []
+        # Reuse a recent result for identical queries instead of another round trip
+        cache_key = (limit, activity_type, start_date, end_date)
+        cached = self._list_cache.pop(cache_key, None)
+        if cached and time.monotonic() - cached[0] < self._LIST_CACHE_TTL:
+            self._list_cache[cache_key] = cached  # Mark as most recently used
+            logger.debug("Using cached activity list for %s", cache_key)
+            return list(cached[1])
         
-        # Set cookies with the token
-        cookies = {
-            'CPL-coros-region': '2',  # China region
-            'CPL-coros-token': self.token
-        }
+        if not self._ensure_token():
+            logger.error("Failed to authenticate with Coros CN")
+            return []
         
         # Prepare parameters for activity list query
         page_size = min(limit, 20)  # API default is 20 per page
@@ -411,62 +667,43 @@ class CorosCNPlatform(CorosPlatform):
         # Prepare activity type filter if specified
         mode_list = ''
         if activity_type:
-            # Map activity types to Coros codes if needed
-            # This would need to be expanded based on Coros activity type codes
-            activity_map = {
-                'running': '8',
-                'cycling': '15',
-                'swimming': '19',
-                'trail_running': '8',
-                'hiking': '15'
-            }
-            modes = []
-            for act_type in activity_type.split(','):
-                if act_type in activity_map:
-                    modes.append(activity_map[act_type])
+            # Map activity types to Coros mode codes, dropping duplicates
+            # (e.g. running and trail_running share a mode) while keeping order
+            modes = dict.fromkeys(
+                ACTIVITY_MODE_MAP[act_type] for act_type in activity_type.split(',')
+                if act_type in ACTIVITY_MODE_MAP
+            )
             if modes:
                 mode_list = ','.join(modes)
         
-        # Build query URL with parameters
-        query_url = f"https://teamcnapi.coros.com/activity/query?size={page_size}&pageNumber={page_number}&modeList={mode_list}"
+        # Query parameters; requests handles the encoding
+        query_url = "https://teamcnapi.coros.com/activity/query"
+        params = {
+            'size': page_size,
+            'pageNumber': page_number,
+            'modeList': mode_list
+        }
         
-        # Add date filters if specified
-        date_params = {}
+        # Add date filters if specified, converting YYYY-MM-DD to Coros date format (YYYYMMDD)
         if start_date:
-            # Convert YYYY-MM-DD to Coros date format (YYYYMMDD)
-            start_date_formatted = start_date.replace('-', '')
-            date_params['startDate'] = start_date_formatted
+            params['startDate'] = start_date.replace('-', '')
             
         if end_date:
-            # Convert YYYY-MM-DD to Coros date format (YYYYMMDD)
-            end_date_formatted = end_date.replace('-', '')
-            date_params['endDate'] = end_date_formatted
-            
-        # Update query URL with date parameters if any
-        if date_params:
-            for key, value in date_params.items():
-                query_url += f"&{key}={value}"
+            params['endDate'] = end_date.replace('-', '')
         
         # Make the request to get activities
-        logger.debug(f"Sending activity list request to {query_url}")
+        logger.debug("Sending activity list request to %s with %s", query_url, params)
         try:
-            headers = {
-                'accept': 'application/json, text/plain, */*',
-                'accesstoken': self.token,
-                'origin': 'https://trainingcn.coros.com',
-                'referer': 'https://trainingcn.coros.com/',
-                'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36'
-            }
-            
-            response = self.session.get(
+            response = self._request(
+                'get',
                 query_url,
-                headers=headers,
-                cookies=cookies
+                params=params,
+                headers=self._API_HEADERS
             )
             
             # Check response
             if response.status_code == 200:
-                response_data = response.json()
+                response_data = _json_loads(response.content)
                 
                 # Check if the request was successful
                 if response_data.get('result') == "0000" and response_data.get('message') == "OK":
@@ -475,34 +712,19 @@ class CorosCNPlatform(CorosPlatform):
                     
                     # Convert to standardized format
                     formatted_activities = []
+                    sport_type_get = SPORT_TYPE_MAP.get
                     for activity in activities_data:
                         # Get activity date and time
                         start_time = activity.get('startTime')
                         activity_date = datetime.datetime.fromtimestamp(start_time)
                         
                         # Map activity types
-                        sport_type = activity.get('sportType')
-                        activity_type_map = {
-                            100: 'running',
-                            101: 'treadmill',
-                            102: 'trail_running',
-                            103: 'track_running',
-                            108: 'indoor_walk',
-                            109: 'walk',
-                            110: 'hike',
-                            115: 'cycling',
-                            119: 'swimming',
-                            111: 'mountaineering',
-                            # Add more mappings as needed
-                        }
+                        mapped_activity_type = sport_type_get(activity.get('sportType'), 'other')
                         
-                        mapped_activity_type = activity_type_map.get(sport_type, 'other')
-                        
-                        # Calculate duration in minutes:seconds
+                        # Calculate duration in hours:minutes:seconds
                         duration_seconds = activity.get('workoutTime', 0)
-                        hours = duration_seconds // 3600
-                        minutes = (duration_seconds % 3600) // 60
-                        seconds = duration_seconds % 60
+                        hours, remainder = divmod(duration_seconds, 3600)
+                        minutes, seconds = divmod(remainder, 60)
                         duration_formatted = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
                         
                         # Format distance in km
@@ -512,7 +734,7 @@ class CorosCNPlatform(CorosPlatform):
                         # Create formatted activity
                         formatted_activity = {
                             "id": f"COROS_CN_{activity.get('labelId')}",
-                            "startTime": activity_date.strftime("%Y-%m-%d %H:%M:%S"),
+                            "startTime": activity_date.isoformat(sep=' ', timespec='seconds'),
                             "activityType": mapped_activity_type,
                             "duration": duration_formatted,
                             "distance": f"{distance_km:.2f} km",
@@ -523,7 +745,12 @@ class CorosCNPlatform(CorosPlatform):
                         
                         formatted_activities.append(formatted_activity)
                     
-                    return formatted_activities
+                    self._list_cache[cache_key] = (time.monotonic(), formatted_activities)
+                    if len(self._list_cache) > self._LIST_CACHE_SIZE:
+                        # Evict the least recently used entry
+                        del self._list_cache[next(iter(self._list_cache))]
+                    
+                    return list(formatted_activities)
                 else:
                     logger.error(f"Failed to get activities: {response_data.get('message')}")
             else:
@@ -535,8 +762,10 @@ class CorosCNPlatform(CorosPlatform):
                     
         except Exception as e:
             logger.error(f"Error fetching activities: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            # Only walk the stack when the traceback will actually be logged
+            if logger.isEnabledFor(logging.DEBUG):
+                import traceback
+                logger.debug(traceback.format_exc())
         
         return []
         
@@ -550,12 +779,11 @@ class CorosCNPlatform(CorosPlatform):
         Returns:
             Path to the downloaded FIT file, or None if download failed
         """
-        logger.info(f"Downloading activity {activity_id} from Coros CN")
+        logger.info("Downloading activity %s from Coros CN", activity_id)
         
-        if not self.token:
-            if not self.authenticate():
-                logger.error("Failed to authenticate with Coros CN")
-                return None
+        if not self._ensure_token():
+            logger.error("Failed to authenticate with Coros CN")
+            return None
         
         # Extract the actual activity ID from the formatted ID
         # Format is COROS_CN_{activity_id}
@@ -564,58 +792,85 @@ class CorosCNPlatform(CorosPlatform):
         else:
             coros_activity_id = activity_id  # Use as is if no prefix
             
-        logger.debug(f"Extracted Coros activity ID: {coros_activity_id}")
-        
-        # Set cookies with the token
-        cookies = {
-            'CPL-coros-region': '2',  # China region
-            'CPL-coros-token': self.token
-        }
+        logger.debug("Extracted Coros activity ID: %s", coros_activity_id)
         
         # Build download URL
         download_url = f"https://teamcnapi.coros.com/activity/export/fit/{coros_activity_id}"
         
         # Make the request to download the FIT file
-        logger.debug(f"Sending FIT file download request to {download_url}")
+        logger.debug("Sending FIT file download request to %s", download_url)
         try:
-            headers = {
-                'accept': 'application/octet-stream',
-                'accesstoken': self.token,
-                'origin': 'https://trainingcn.coros.com',
-                'referer': 'https://trainingcn.coros.com/',
-                'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36'
-            }
-            
-            response = self.session.get(
+            response = self._request(
+                'get',
                 download_url,
-                headers=headers,
-                cookies=cookies,
+                headers=self._DOWNLOAD_HEADERS,
                 stream=True  # Use streaming for binary files
             )
             
-            # Check response
-            if response.status_code == 200:
-                # Prepare output file path
-                fit_file = self.cache_dir / f"{activity_id}.fit"
-                
-                # Save the downloaded file
-                with open(fit_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                
-                logger.info(f"Successfully downloaded FIT file to {fit_file}")
-                return fit_file
-            else:
-                logger.error(f"Failed to download FIT file with status code: {response.status_code}")
-                try:
-                    logger.error(f"Error response: {response.text}")
-                except:
-                    pass
+            # Release the streamed connection back to the pool on every path
+            with response:
+                # Check response
+                if response.status_code == 200:
+                    # Prepare output file path
+                    fit_file = self.cache_dir / f"{activity_id}.fit"
+                    
+                    # Save to a temporary file and move it into place, so a failed
+                    # download never leaves a truncated FIT file in the cache
+                    tmp_file = tempfile.NamedTemporaryFile(
+                        'wb', dir=self.cache_dir, prefix=f"{activity_id}.", suffix='.part', delete=False
+                    )
+                    try:
+                        with tmp_file:
+                            for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                                if chunk:
+                                    tmp_file.write(chunk)
+                        os.replace(tmp_file.name, fit_file)
+                    except BaseException:
+                        Path(tmp_file.name).unlink(missing_ok=True)
+                        raise
+                    
+                    logger.info(f"Successfully downloaded FIT file to {fit_file}")
+                    return fit_file
+                else:
+                    logger.error(f"Failed to download FIT file with status code: {response.status_code}")
+                    try:
+                        logger.error(f"Error response: {response.text}")
+                    except:
+                        pass
                     
         except Exception as e:
             logger.error(f"Error downloading FIT file: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            # Only walk the stack when the traceback will actually be logged
+            if logger.isEnabledFor(logging.DEBUG):
+                import traceback
+                logger.debug(traceback.format_exc())
+        
+        return None
+    
+    def download_activities(self, activity_ids: List[str], max_workers: int = 8) -> Dict[str, Optional[Path]]:
+        """
+        Download FIT files for several activities concurrently.
+        
+        Downloads are network-bound, so they run in a thread pool over the
+        shared pooled session.
         
-        return None 
\ No newline at end of file
+        Args:
+            activity_ids: The Coros activity IDs (format: COROS_CN_{activity_id})
+            max_workers: Maximum number of concurrent downloads
+            
+        Returns:
+            Dictionary mapping each activity ID to its downloaded FIT file,
+            or None if that download failed
+        """
+        if not activity_ids:
+            return {}
+        
+        # Authenticate once up front instead of in every worker
+        if not self._ensure_token():
+            logger.error("Failed to authenticate with Coros CN")
+            return {activity_id: None for activity_id in activity_ids}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(activity_ids))) as executor:
+            fit_files = list(executor.map(self.download_activity, activity_ids))
+            
+        return dict(zip(activity_ids, fit_files))
@@ -3,32 +3,72 @@ Garmin platform implementation for fit_sync.
 """
 
 import logging
-import os
 import datetime
+import threading
 import uuid
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# HTTP session shared by all Garmin platform instances, created on first use
+_session = None
+_session_lock = threading.Lock()
+
+def _get_session():
+    """
+    Get the HTTP session shared by all Garmin platform instances.
+    
+    Requests to Garmin must go through this session rather than the
+    module-level requests functions, so the US and CN platforms (and any
+    further accounts) reuse one pool of keep-alive connections instead of
+    opening a new TLS connection each time.
+    
+    Returns:
+        Shared requests.Session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            # requests is imported here so that importing this module stays cheap
+            import requests
+            from requests.adapters import HTTPAdapter
+            
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=3))
+            _session = session
+        return _session
+
 class GarminPlatform:
     """Base class for Garmin platform implementations."""
     
-    def __init__(self, credentials: Dict[str, str], cache_dir: str):
+    # list_activities returns exactly the requested activity types
+    supports_server_activity_type_filter = True
+    
+    def __init__(self, credentials: Dict[str, str], cache_dir: Union[str, Path], session=None):
         """
         Initialize the Garmin platform.
         
         Args:
             credentials: Dictionary containing 'email' and 'password'
-            cache_dir: Directory to store cached data
+            cache_dir: Directory to store cached data (str or Path)
+            session: HTTP session to use instead of the shared one (e.g. in tests)
         """
         self.email = credentials.get('email')
         self.password = credentials.get('password')
-        self.cache_dir = Path(os.path.expanduser(cache_dir))
-        self.session = None
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.session = session if session is not None else _get_session()
         
         # Create cache directory if it doesn't exist
-        os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+    def close(self):
+        """
+        Release the shared session's pooled connections.
+        
+        The session stays usable; later requests open new connections.
+        """
+        self.session.close()
         
     def authenticate(self) -> bool:
         """
@@ -61,41 +101,48 @@ class GarminPlatform:
         logger.info(f"Listing up to {limit} activities from Garmin")
         
         # Generate sample data for stub implementation
-        activities = []
         activity_types = ["running", "cycling", "swimming", "hiking"]
         
         # Apply activity_type filter if specified
         if activity_type:
-            filtered_types = activity_type.split(',')
+            filtered_types = set(activity_type.split(','))
             activity_types = [t for t in activity_types if t in filtered_types]
+            if not activity_types:
+                return []
             
+        now = datetime.datetime.now()
+        today = now.date()
+        types_len = len(activity_types)
+        step = datetime.timedelta(days=2)  # Every 2 days
+        
+        # Activity i falls on today - 2*i days, so the date filters map to a
+        # contiguous index range and no per-activity date check is needed
+        start_i, stop_i = 0, limit
+        try:
+            if end_date:
+                days_after_end = (today - datetime.date.fromisoformat(end_date)).days
+                start_i = max(start_i, -(-days_after_end // 2))  # ceil division
+            if start_date:
+                days_since_start = (today - datetime.date.fromisoformat(start_date)).days
+                stop_i = min(stop_i, days_since_start // 2 + 1)
+        except ValueError:
+            logger.error(f"Invalid date filter (expected YYYY-MM-DD): start={start_date!r}, end={end_date!r}")
+            return []
+        
         # Create sample activities
-        for i in range(limit):
-            # Generate a date between 2023-01-01 and today
-            days_ago = i * 2  # Every 2 days
-            activity_date = datetime.datetime.now() - datetime.timedelta(days=days_ago)
-            activity_date_str = activity_date.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Check date filters
-            if start_date and activity_date.strftime("%Y-%m-%d") < start_date:
-                continue
-                
-            if end_date and activity_date.strftime("%Y-%m-%d") > end_date:
-                continue
-            
-            activity = {
+        return [
+            {
                 "id": str(uuid.uuid4()),
-                "startTime": activity_date_str,
-                "activityType": activity_types[i % len(activity_types)],
+                "startTime": (now - step * i).strftime("%Y-%m-%d %H:%M:%S"),
+                "activityType": activity_types[i % types_len],
                 "duration": f"00:{30 + i * 2:02d}:{i:02d}",  # Format as HH:MM:SS
                 "distance": f"{5.0 + i * 0.5:.1f} km",
                 "elevationGain": f"{i * 10} m",
                 "avgHR": 140 + i,
                 "calories": 200 + i * 50
             }
-            activities.append(activity)
-        
-        return activities
+            for i in range(start_i, stop_i)
+        ]
         
     def download_activity(self, activity_id: str) -> Optional[Path]:
         """
@@ -137,14 +184,14 @@ class GarminPlatform:
 class GarminUSPlatform(GarminPlatform):
     """Garmin US platform implementation."""
     
-    def __init__(self, credentials: Dict[str, str], cache_dir: str):
-        super().__init__(credentials, cache_dir)
+    def __init__(self, credentials: Dict[str, str], cache_dir: Union[str, Path], session=None):
+        super().__init__(credentials, cache_dir, session)
         self.base_url = "https://connect.garmin.com"
         
 
 class GarminCNPlatform(GarminPlatform):
     """Garmin China platform implementation."""
     
-    def __init__(self, credentials: Dict[str, str], cache_dir: str):
-        super().__init__(credentials, cache_dir)
+    def __init__(self, credentials: Dict[str, str], cache_dir: Union[str, Path], session=None):
+        super().__init__(credentials, cache_dir, session)
         self.base_url = "https://connect.garmin.cn" 
\ No newline at end of file
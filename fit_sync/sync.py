@@ -2,20 +2,131 @@
 Core synchronization functionality for fit_sync.
 """
 
+import hashlib
+import json
 import logging
 import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
-import datetime
+from typing import Callable, Dict, List, Optional, Set, Union, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 
 from .platforms.garmin import GarminUSPlatform, GarminCNPlatform
 from .platforms.coros import CorosCNPlatform
 
 logger = logging.getLogger(__name__)
 
+def _copy_file(src: Path, dst: Path):
+    """
+    Copy a file as cheaply as the filesystem allows.
+    
+    Tries os.copy_file_range (which can reflink on copy-on-write filesystems
+    and otherwise copies in the kernel) and falls back to shutil.copyfile.
+    The destination is always a separate file: platforms rewrite their cache
+    files in place, so a hard link would keep changing under the user.
+    
+    The copy is written to a temporary file next to dst and then moved over
+    it, so an existing dst is never opened for writing. If dst is a hard link
+    of src, truncating it would wipe src as well. The temporary file is
+    created private (0600), so src's permission bits are copied onto it
+    before it is moved into place.
+    
+    Args:
+        src: File to copy
+        dst: Destination path; replaced if it already exists
+    """
+    with tempfile.NamedTemporaryFile('wb', dir=dst.parent, suffix='.tmp', delete=False) as f:
+        tmp_file = Path(f.name)
+    
+    try:
+        copied = False
+        if hasattr(os, 'copy_file_range'):
+            try:
+                with open(src, 'rb') as fsrc, open(tmp_file, 'wb') as fdst:
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                        if n == 0:
+                            break
+                        remaining -= n
+                copied = remaining == 0
+            except OSError:
+                pass
+        
+        if not copied:
+            shutil.copyfile(src, tmp_file)
+        shutil.copymode(src, tmp_file)
+        os.replace(tmp_file, dst)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+class _LazyPlatforms(Mapping):
+    """
+    Read-only mapping of platform ID -> platform instance.
+    
+    Platforms are only constructed on first access, so commands that touch
+    one account don't pay for creating sessions and cache directories for
+    every other configured account.
+    """
+    
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        """
+        Initialize the mapping.
+        
+        Args:
+            factories: Dictionary mapping platform IDs to zero-argument constructors
+        """
+        self._factories = factories
+        self._platforms = {}
+        self._lock = threading.Lock()
+        
+    def __getitem__(self, platform_id: str):
+        platform = self._platforms.get(platform_id)
+        if platform is None:
+            factory = self._factories[platform_id]
+            with self._lock:
+                platform = self._platforms.get(platform_id)
+                if platform is None:
+                    platform = self._platforms[platform_id] = factory()
+        return platform
+    
+    def __contains__(self, platform_id) -> bool:
+        return platform_id in self._factories
+    
+    def __iter__(self):
+        return iter(self._factories)
+    
+    def __len__(self) -> int:
+        return len(self._factories)
+    
+    def loaded(self) -> List[Any]:
+        """
+        Get the platforms that have been constructed so far.
+        
+        Returns:
+            List of platform instances
+        """
+        return list(self._platforms.values())
+
 class SyncManager:
     """Manages the synchronization between fitness platforms."""
     
+    # Maximum number of activity listings kept in memory
+    ACTIVITIES_CACHE_SIZE = 128
+    
+    # Seconds to wait before retrying a platform whose login failed
+    AUTH_FAILURE_COOLDOWN = 60
+    
+    # Seconds a successful login is trusted before authenticating again
+    AUTH_TTL = 1800
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the sync manager.
@@ -25,34 +136,41 @@ class SyncManager:
         """
         self.config = config
         self.cache_dir = Path(config.get('cache', {}).get('directory', '~/.fit_sync/cache')).expanduser()
-        self.platforms = {}
-        self._activities_cache = {}  # 活动列表缓存
-        self._activities_cache_timestamp = {}  # 缓存时间戳
+        self.platforms = _LazyPlatforms({})
+        self._activities_cache = OrderedDict()  # 活动列表缓存: key -> (缓存时间, activities), LRU order
+        self._authenticated = {}  # platform_id -> time.monotonic() of the last successful login
+        self._auth_failures = {}  # platform_id -> time.monotonic() of the last failed login
+        # Per-platform cache generation; bumping it orphans that platform's cached listings
+        self._cache_generations = {}
+        self._cache_generations_lock = threading.Lock()
         
         # Initialize platforms
         self._init_platforms()
         
     def _init_platforms(self):
-        """Initialize platform instances based on configuration."""
+        """Register platforms based on configuration; each is built on first use."""
         accounts = self.config.get('accounts', {})
+        # Platforms accept the already-expanded Path directly
+        cache_dir = self.cache_dir
+        factories = {}
         
         if 'garmin_us' in accounts:
-            self.platforms['garmin_us'] = GarminUSPlatform(
-                accounts['garmin_us'],
-                str(self.cache_dir)
-            )
+            factories['garmin_us'] = lambda: GarminUSPlatform(accounts['garmin_us'], cache_dir)
             
         if 'garmin_cn' in accounts:
-            self.platforms['garmin_cn'] = GarminCNPlatform(
-                accounts['garmin_cn'],
-                str(self.cache_dir)
-            )
+            factories['garmin_cn'] = lambda: GarminCNPlatform(accounts['garmin_cn'], cache_dir)
             
         if 'coros_cn' in accounts:
-            self.platforms['coros_cn'] = CorosCNPlatform(
-                accounts['coros_cn'],
-                str(self.cache_dir)
-            )
+            factories['coros_cn'] = lambda: CorosCNPlatform(accounts['coros_cn'], cache_dir)
+            
+        self.platforms = _LazyPlatforms(factories)
+    
+    def close(self):
+        """Release resources held by the platforms, such as pooled HTTP connections."""
+        for platform in self.platforms.loaded():
+            close = getattr(platform, 'close', None)
+            if close:
+                close()
     
     def authenticate_all(self) -> bool:
         """
@@ -61,15 +179,83 @@ class SyncManager:
         Returns:
             True if all authentications were successful, False otherwise
         """
+        if not self.platforms:
+            return True
+            
+        # Logins are network-bound, so run them concurrently and report
+        # each result as soon as it arrives
         success = True
-        for platform_id, platform in self.platforms.items():
-            logger.info(f"Authenticating with {platform_id}")
-            if not platform.authenticate():
-                logger.error(f"Authentication failed for {platform_id}")
-                success = False
+        max_workers = min(8, len(self.platforms))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for platform_id, platform in self.platforms.items():
+                if self._is_authenticated(platform_id):
+                    continue
+                logger.info(f"Authenticating with {platform_id}")
+                futures[executor.submit(platform.authenticate)] = platform_id
+                
+            for future in as_completed(futures):
+                platform_id = futures[future]
+                try:
+                    authenticated = future.result()
+                except Exception as e:
+                    logger.error(f"Authentication error for {platform_id}: {str(e)}")
+                    authenticated = False
+                if authenticated:
+                    self._authenticated[platform_id] = time.monotonic()
+                    self._auth_failures.pop(platform_id, None)
+                else:
+                    logger.error(f"Authentication failed for {platform_id}")
+                    self._auth_failures[platform_id] = time.monotonic()
+                    success = False
                 
         return success
     
+    def _is_authenticated(self, platform_id: str) -> bool:
+        """
+        Check whether a platform logged in successfully within AUTH_TTL.
+        
+        Args:
+            platform_id: ID of the platform to check
+            
+        Returns:
+            True if the platform has a recent successful login, False otherwise
+        """
+        authenticated_at = self._authenticated.get(platform_id)
+        return authenticated_at is not None and time.monotonic() - authenticated_at < self.AUTH_TTL
+    
+    def _authenticate_platform(self, platform_id: str) -> bool:
+        """
+        Authenticate with a platform, unless it logged in or failed recently.
+        
+        Successful logins are reused for AUTH_TTL, and remembering failures
+        keeps repeated calls with bad credentials from hammering the
+        platform's login endpoint.
+        
+        Args:
+            platform_id: ID of the platform to authenticate with
+            
+        Returns:
+            True if authentication was successful, False otherwise
+        """
+        if self._is_authenticated(platform_id):
+            return True
+            
+        failed_at = self._auth_failures.get(platform_id)
+        if failed_at is not None:
+            elapsed = time.monotonic() - failed_at
+            if elapsed < self.AUTH_FAILURE_COOLDOWN:
+                logger.debug(f"Not retrying {platform_id} login, it failed {elapsed:.0f}s ago")
+                return False
+            
+        if not self.platforms[platform_id].authenticate():
+            self._auth_failures[platform_id] = time.monotonic()
+            return False
+            
+        self._auth_failures.pop(platform_id, None)
+        self._authenticated[platform_id] = time.monotonic()
+        return True
+    
     def download_activity(self, 
                         platform_id: str, 
                         activity_id: str, 
@@ -93,8 +279,8 @@ class SyncManager:
             
         platform = self.platforms[platform_id]
         
-        # Authenticate before download
-        if not platform.authenticate():
+        # Reuses a recent login; platforms refresh rejected tokens themselves
+        if not self._authenticate_platform(platform_id):
             logger.error(f"Authentication failed for {platform_id}")
             return None
             
@@ -107,7 +293,7 @@ class SyncManager:
         # If output directory specified, copy the file there with custom name
         if output_dir:
             output_path = Path(output_dir)
-            os.makedirs(output_path, exist_ok=True)
+            output_path.mkdir(parents=True, exist_ok=True)
             
             # Use custom filename if provided, otherwise use original filename
             if output_filename:
@@ -115,9 +301,7 @@ class SyncManager:
             else:
                 dest_file = output_path / fit_file.name
                 
-            # Copy file
-            import shutil
-            shutil.copy(fit_file, dest_file)
+            _copy_file(fit_file, dest_file)
             return dest_file
             
         return fit_file
@@ -141,24 +325,20 @@ class SyncManager:
             int: Total number of activities synced.
         """
         rules = []
-        configured_accounts = self.config.get("accounts", {}).keys()
+        # Platforms a rule may use: configured accounts that have a platform
+        usable = set(self.config.get("accounts", {})) & set(self.platforms)
+        
+        def unusable(*platform_ids):
+            missing = [pid for pid in platform_ids if pid not in usable]
+            if missing:
+                logging.error(
+                    f"Platform(s) not configured or initialized: {', '.join(map(str, missing))}"
+                )
+            return bool(missing)
         
         # If specific source/destination provided, create a single rule
         if source and destination:
-            # Check if both platforms are configured
-            if source not in configured_accounts:
-                logging.error(f"Source platform {source} not configured")
-                return 0
-            if destination not in configured_accounts:
-                logging.error(f"Destination platform {destination} not configured")
-                return 0
-            
-            # Check if both platforms are in self.platforms
-            if source not in self.platforms:
-                logging.error(f"Source platform {source} not initialized")
-                return 0
-            if destination not in self.platforms:
-                logging.error(f"Destination platform {destination} not initialized")
+            if unusable(source, destination):
                 return 0
             
             rules.append({
@@ -175,25 +355,20 @@ class SyncManager:
                 source_id = rule.get("source")
                 dest_id = rule.get("destination")
                 
-                # Skip rule if either platform not configured
-                if source_id not in configured_accounts:
-                    logging.error(f"Source platform {source_id} not configured")
-                    continue
-                if dest_id not in configured_accounts:
-                    logging.error(f"Destination platform {dest_id} not configured")
-                    continue
-                
-                # Skip rule if either platform not in self.platforms
-                if source_id not in self.platforms:
-                    logging.error(f"Source platform {source_id} not initialized")
-                    continue
-                if dest_id not in self.platforms:
-                    logging.error(f"Destination platform {dest_id} not initialized")
+                # Skip rule if either platform is not usable
+                if unusable(source_id, dest_id):
                     continue
                 
                 rules.append(rule)
         
         total_synced = 0
+        max_workers = max(1, self.config.get('sync', {}).get('max_workers', 8))
+        
+        # Rules may overlap, so remember across rules which FIT files were
+        # already downloaded from each source and which activities were
+        # already handled for each source/destination pair
+        downloaded = defaultdict(dict)  # source_id -> {activity_id: fit_file}
+        handled = defaultdict(set)  # (source_id, dest_id) -> {activity_id}
         
         for rule in rules:
             source_id = rule.get("source")
@@ -204,52 +379,138 @@ class SyncManager:
             rule_start_date = start_date or rule.get('start_date')
             rule_end_date = end_date or rule.get('end_date')
             
+            # Look both platforms up once per rule rather than once per activity
+            source_platform = self.platforms[source_id]
+            dest_platform = self.platforms[dest_id]
+            
             # List activities from source
-            activities = self.platforms[source_id].list_activities(
+            activities = source_platform.list_activities(
                 limit=100,  # Use a reasonable limit for batch processing
                 activity_type=','.join(rule_activity_types) if rule_activity_types else None,
                 start_date=rule_start_date,
                 end_date=rule_end_date
             )
             
-            # Filter activities based on activity type if needed
-            if rule_activity_types:
-                filtered_activities = [
+            # Filter activities based on activity type, unless the source
+            # platform already applied the filter exactly. The filter is lazy,
+            # so activities are filtered as they are handed out for syncing.
+            if rule_activity_types and not getattr(
+                source_platform, 'supports_server_activity_type_filter', False
+            ):
+                wanted_types = frozenset(rule_activity_types)
+                activities = (
                     activity for activity in activities 
-                    if activity.get("activityType") in rule_activity_types
-                ]
-                logger.info(f"Filtered from {len(activities)} to {len(filtered_activities)} activities based on activity types")
-                activities = filtered_activities
+                    if activity.get("activityType") in wanted_types
+                )
             
-            logger.info(f"Found {len(activities)} activities to sync from {source_id} to {dest_id}")
+            # Pick the upload step once per rule, so the per-activity path
+            # does not branch on dry_run
+            if dry_run:
+                upload = partial(self._simulate_upload, dest_id=dest_id)
+            else:
+                upload = partial(self._upload_activity, dest_platform=dest_platform, dest_id=dest_id)
+            sync_one = partial(
+                self._sync_one,
+                source_platform=source_platform,
+                upload=upload,
+                downloaded=downloaded[source_id],
+                handled=handled[(source_id, dest_id)]
+            )
+            if max_workers == 1:
+                # Sequential mode, for platforms that must not be used from several threads
+                outcomes = Counter(map(sync_one, activities))
+            else:
+                # Each activity is downloaded and uploaded independently, and both
+                # steps are network-bound, so process several at once. The pool
+                # only starts threads as work is submitted, so an empty listing
+                # costs nothing.
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    outcomes = Counter(executor.map(sync_one, activities))
             
-            # Process activities
-            for activity in activities:
-                activity_id = activity.get('id')
-                if not activity_id:
-                    continue
-                    
-                # Download FIT file
-                fit_file = self.platforms[source_id].download_activity(activity_id)
-                if not fit_file:
-                    logger.warning(f"Failed to download activity {activity_id}")
-                    continue
-                    
-                if dry_run:
-                    logger.info(f"[DRY RUN] Would upload {fit_file} to {dest_id}")
-                    total_synced += 1
-                    continue
-                    
-                # Upload to destination
-                new_activity_id = self.platforms[dest_id].upload_activity(fit_file)
-                if new_activity_id:
-                    logger.info(f"Successfully synced activity {activity_id} to {dest_id} as {new_activity_id}")
-                    total_synced += 1
-                else:
-                    logger.error(f"Failed to upload activity {activity_id} to {dest_id}")
+            # One summary line per rule; per-activity detail is logged at DEBUG
+            logger.info(
+                f"Rule {source_id} -> {dest_id}: {outcomes[True]} synced, "
+                f"{outcomes[False]} failed, {outcomes[None]} skipped"
+            )
+            total_synced += outcomes[True]
                     
         return total_synced 
 
+    def _sync_one(self, activity: Dict, source_platform,
+                  upload: Callable[[str, Path], bool],
+                  downloaded: Dict[str, Path], handled: Set[str]) -> Optional[bool]:
+        """
+        Copy a single activity from one platform to another.
+        
+        Args:
+            activity: Activity dictionary from the source platform
+            source_platform: Platform to download the activity from
+            upload: Uploads (or simulates uploading) a FIT file, given the
+                activity ID and file; returns True on success
+            downloaded: FIT files already downloaded from the source, by activity ID
+            handled: IDs of activities already handled for this source and destination
+            
+        Returns:
+            True if the activity was synced (or would be, in a dry run), False if
+            it failed, or None if it was skipped because it has no ID or was
+            already handled by an earlier rule
+        """
+        activity_id = activity.get('id')
+        if not activity_id or activity_id in handled:
+            return None
+        handled.add(activity_id)
+            
+        # Download FIT file, unless a rule with the same source already did
+        fit_file = downloaded.get(activity_id)
+        if fit_file is None:
+            fit_file = source_platform.download_activity(activity_id)
+            if not fit_file:
+                logger.warning(f"Failed to download activity {activity_id}")
+                return False
+            downloaded[activity_id] = fit_file
+            
+        return upload(activity_id, fit_file)
+        
+    def _simulate_upload(self, activity_id: str, fit_file: Path, dest_id: str) -> bool:
+        """
+        Stand in for an upload during a dry run.
+        
+        Args:
+            activity_id: Source activity ID
+            fit_file: Path to the downloaded FIT file
+            dest_id: Destination platform ID
+            
+        Returns:
+            Always True
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[DRY RUN] Would upload {fit_file} to {dest_id}")
+        return True
+        
+    def _upload_activity(self, activity_id: str, fit_file: Path, dest_platform, dest_id: str) -> bool:
+        """
+        Upload a downloaded FIT file to the destination platform.
+        
+        Args:
+            activity_id: Source activity ID
+            fit_file: Path to the downloaded FIT file
+            dest_platform: Platform to upload the activity to
+            dest_id: Destination platform ID
+            
+        Returns:
+            True if the upload succeeded, False otherwise
+        """
+        new_activity_id = dest_platform.upload_activity(fit_file)
+        if new_activity_id:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Successfully synced activity {activity_id} to {dest_id} as {new_activity_id}")
+            # The destination's activity list has changed
+            self.invalidate_activities_cache(dest_id)
+            return True
+        
+        logger.error(f"Failed to upload activity {activity_id} to {dest_id}")
+        return False
+
     def get_activities(self, 
                       platform_id: str,
                       limit: int = 10,
@@ -278,26 +539,19 @@ class SyncManager:
             return []
             
         # Create cache key based on query parameters
-        cache_key = f"{platform_id}:{limit}:{activity_type}:{start_date}:{end_date}"
+        generation = self._cache_generations.get(platform_id, 0)
+        cache_key = f"{platform_id}:{generation}:{limit}:{activity_type}:{start_date}:{end_date}"
         
         # Check if we have cached results that aren't expired
-        current_time = datetime.datetime.now()
-        if (use_cache and 
-            cache_key in self._activities_cache and 
-            cache_key in self._activities_cache_timestamp):
-            
-            cache_time = self._activities_cache_timestamp[cache_key]
-            age_minutes = (current_time - cache_time).total_seconds() / 60
-            
-            if age_minutes <= cache_max_age:
-                logger.debug(f"Using cached activities for {platform_id} (age: {age_minutes:.1f} minutes)")
-                return self._activities_cache[cache_key]
-            else:
-                logger.debug(f"Cache expired for {platform_id} (age: {age_minutes:.1f} minutes)")
+        now = time.monotonic()
+        if use_cache:
+            cached = self._load_activities_cache(cache_key, now, cache_max_age)
+            if cached is not None:
+                return cached
         
         # Authenticate with platform
         platform = self.platforms[platform_id]
-        if not platform.authenticate():
+        if not self._authenticate_platform(platform_id):
             logger.error(f"Authentication failed for {platform_id}")
             return []
         
@@ -310,14 +564,154 @@ class SyncManager:
         )
         
         # Cache the results with timestamp
-        self._activities_cache[cache_key] = activities
-        self._activities_cache_timestamp[cache_key] = current_time
+        self._store_activities_cache(cache_key, activities, now)
         logger.debug(f"Cached {len(activities)} activities for {platform_id}")
         
         return activities
         
+    def _activities_cache_file(self, cache_key: str) -> Path:
+        """
+        Get the on-disk cache file for an activities query.
+        
+        Args:
+            cache_key: Cache key describing the query
+            
+        Returns:
+            Path to the cache file
+        """
+        platform_id = cache_key.split(':', 1)[0]
+        digest = hashlib.sha1(cache_key.encode()).hexdigest()
+        return self.cache_dir / 'activities' / platform_id / f"{digest}.json"
+        
+    def _load_activities_cache(self,
+                               cache_key: str,
+                               now: float,
+                               cache_max_age: int) -> Optional[List[Dict]]:
+        """
+        Look up cached activities, first in memory and then on disk.
+        
+        The disk cache lets separate CLI invocations reuse a recent listing.
+        In memory, entries are timestamped with time.monotonic(); on disk,
+        where they must outlive the process, with the wall-clock time.time().
+        
+        Args:
+            cache_key: Cache key describing the query
+            now: Current time.monotonic() to measure the cache age against
+            cache_max_age: Maximum age of cache in minutes
+            
+        Returns:
+            Cached activities, or None if there is no fresh entry
+        """
+        max_age_seconds = cache_max_age * 60
+        cached = self._activities_cache.get(cache_key)
+        if cached is not None:
+            cache_time, activities = cached
+            age_seconds = now - cache_time
+            if age_seconds <= max_age_seconds:
+                logger.debug(f"Using cached activities for {cache_key} (age: {age_seconds / 60:.1f} minutes)")
+                self._activities_cache.move_to_end(cache_key)
+                return activities
+            
+            # The disk copy is never newer than the in-memory one
+            logger.debug(f"Cache expired for {cache_key} (age: {age_seconds / 60:.1f} minutes)")
+            return None
+        
+        cache_file = self._activities_cache_file(cache_key)
+        wall_now = time.time()
+        try:
+            # Skip reading files that are too old by their modification time
+            if cache_file.stat().st_mtime < wall_now - max_age_seconds:
+                return None
+            with open(cache_file, 'rb') as f:
+                cache_data = json.loads(f.read())
+            age_seconds = wall_now - float(cache_data['ts'])
+            activities = cache_data['activities']
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable activities cache {cache_file}: {e}")
+            return None
+        
+        if age_seconds > max_age_seconds:
+            return None
+        
+        # Keep it in memory for the rest of this run
+        self._remember_activities(cache_key, activities, now - age_seconds)
+        logger.debug(f"Using disk-cached activities for {cache_key} (age: {age_seconds / 60:.1f} minutes)")
+        return activities
+        
+    def _remember_activities(self,
+                             cache_key: str,
+                             activities: List[Dict],
+                             cache_time: float):
+        """
+        Add activities to the in-memory cache, evicting the least recently used entries.
+        
+        Args:
+            cache_key: Cache key describing the query
+            activities: Activities to cache
+            cache_time: time.monotonic() when the activities were fetched
+        """
+        self._activities_cache[cache_key] = (cache_time, activities)
+        self._activities_cache.move_to_end(cache_key)
+        while len(self._activities_cache) > self.ACTIVITIES_CACHE_SIZE:
+            self._activities_cache.popitem(last=False)
+        
+    def _store_activities_cache(self,
+                                cache_key: str,
+                                activities: List[Dict],
+                                now: float):
+        """
+        Cache activities in memory and on disk.
+        
+        Args:
+            cache_key: Cache key describing the query
+            activities: Activities to cache
+            now: time.monotonic() when the activities were fetched
+        """
+        self._remember_activities(cache_key, activities, now)
+        
+        cache_file = self._activities_cache_file(cache_key)
+        try:
+            payload = json.dumps(
+                {'ts': time.time(), 'activities': activities},
+                separators=(',', ':')
+            )
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Error saving activities cache: {e}")
+            return
+        
+        tmp_file = None
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and swap it in, so readers never see a partial file
+            with tempfile.NamedTemporaryFile('w', dir=cache_file.parent, suffix='.tmp', delete=False) as f:
+                tmp_file = Path(f.name)
+                f.write(payload)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            if tmp_file is not None:
+                tmp_file.unlink(missing_ok=True)
+            logger.debug(f"Error saving activities cache: {e}")
+        
+    def invalidate_activities_cache(self, platform_id: str):
+        """
+        Invalidate all cached activity listings for a platform.
+        
+        Bumping the platform's generation makes its in-memory entries
+        unreachable without scanning the cache; the platform's disk cache is
+        removed so later runs don't pick up the stale listings either.
+        
+        Args:
+            platform_id: Platform whose activities changed
+        """
+        with self._cache_generations_lock:
+            self._cache_generations[platform_id] = self._cache_generations.get(platform_id, 0) + 1
+        shutil.rmtree(self.cache_dir / 'activities' / platform_id, ignore_errors=True)
+        logger.debug(f"Invalidated activities cache for {platform_id}")
+        
     def clear_activities_cache(self):
-        """Clear the activities cache."""
-        self._activities_cache = {}
-        self._activities_cache_timestamp = {}
+        """Clear the activities cache, both in memory and on disk."""
+        self._activities_cache = OrderedDict()
+        shutil.rmtree(self.cache_dir / 'activities', ignore_errors=True)
         logger.debug("Activities cache cleared") 
\ No newline at end of file
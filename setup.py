@@ -1,11 +1,14 @@
-from setuptools import setup, find_packages
-import os
+from pathlib import Path
 
-with open("README.md", "r", encoding="utf-8") as fh:
-    long_description = fh.read()
+from setuptools import setup
 
-with open("requirements.txt", "r", encoding="utf-8") as fh:
-    requirements = fh.read().splitlines()
+long_description = Path("README.md").read_text(encoding="utf-8")
+# Skip blank lines and comments, which are not requirements
+requirements = [
+    line.strip()
+    for line in Path("requirements.txt").read_text(encoding="utf-8").splitlines()
+    if line.strip() and not line.lstrip().startswith("#")
+]
 
 setup(
     name="fit_sync",
@@ -16,7 +19,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/fit_sync",
-    packages=find_packages(),
+    packages=["fit_sync", "fit_sync.platforms"],
     classifiers=[
         "Programming Language :: Python :: 3",
         "Programming Language :: Python :: 3.10",
@@ -25,6 +28,12 @@ setup(
     ],
     python_requires=">=3.10",
     install_requires=requirements,
+    extras_require={
+        # Faster JSON parsing for the config, token cache and API responses
+        'fast': ['orjson>=3.9'],
+        # Test runner and parallel test execution
+        'dev': ['pytest>=7.0', 'pytest-xdist>=3.0'],
+    },
     entry_points={
         'console_scripts': [
             'fit_sync=fit_sync.__main__:main',
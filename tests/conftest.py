@@ -5,7 +5,6 @@ Global pytest fixtures for fit_sync tests.
 import os
 import json
 import pytest
-import tempfile
 from pathlib import Path
 
 @pytest.fixture
@@ -48,11 +47,31 @@ def mock_config():
         }
     }
 
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Reset the process-wide Coros token cache between tests."""
+    from fit_sync.platforms.coros import CorosPlatform
+    CorosPlatform._token_cache.clear()
+    yield
+    CorosPlatform._token_cache.clear()
+
 @pytest.fixture
-def temp_cache_dir():
+def temp_cache_dir(tmp_path):
     """Create a temporary directory for test cache files."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield Path(temp_dir)
+    return tmp_path
+
+@pytest.fixture(scope="session")
+def credentials():
+    """Platform credentials shared by the platform tests."""
+    return {
+        "email": "test@example.com",
+        "password": "test_password"
+    }
+
+@pytest.fixture(scope="session")
+def shared_cache_dir(tmp_path_factory):
+    """Create one cache directory shared by tests that never write to it."""
+    return tmp_path_factory.mktemp("shared_cache")
 
 @pytest.fixture
 def mock_config_file(mock_config, temp_cache_dir):
@@ -103,10 +122,13 @@ def mock_activity_data():
         }
     ]
 
-@pytest.fixture
-def mock_fit_file(temp_cache_dir):
-    """Create a mock FIT file for testing."""
-    fit_file = temp_cache_dir / "test_activity.fit"
+@pytest.fixture(scope="session")
+def mock_fit_file(tmp_path_factory):
+    """Create a mock FIT file for testing, written once per test session.
+    
+    Tests must not modify it; link or copy it to get a private file.
+    """
+    fit_file = tmp_path_factory.mktemp("fixtures") / "test_activity.fit"
     with open(fit_file, 'w') as f:
         f.write("Mock FIT file content for testing")
     
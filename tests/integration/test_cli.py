@@ -27,7 +27,7 @@ class TestCommandLine:
                 # Should exit with code 0 on success
                 assert e.value.code == 0
 
-    def test_list_command(self, mock_config_file, temp_cache_dir, mock_activity_data):
+    def test_list_command(self, mock_config_file, temp_cache_dir, mock_activity_data, capsys):
         """Test the list command."""
         with patch.object(sys, 'argv', [
             'fit_sync', 'list', '--account', 'garmin_us', '--limit', '5',
@@ -35,15 +35,17 @@ class TestCommandLine:
         ]):
             with patch('fit_sync.platforms.garmin.GarminPlatform.authenticate', return_value=True):
                 with patch('fit_sync.platforms.garmin.GarminPlatform.list_activities', return_value=mock_activity_data):
-                    # Capture stdout to check output
-                    with patch('builtins.print') as mock_print:
-                        with pytest.raises(SystemExit) as e:
-                            main_module.main()
-                        
-                        # Check that print was called with activity info
-                        assert mock_print.call_count > 0
-                        # Should exit with code 0 on success
-                        assert e.value.code == 0
+                    with pytest.raises(SystemExit) as e:
+                        main_module.main()
+                    
+                    # Check that the activity info was written to stdout
+                    output = capsys.readouterr().out
+                    assert "Activities from garmin_us:" in output
+                    for i, activity in enumerate(mock_activity_data):
+                        assert f"{i+1}. {activity['startTime']}" in output
+                        assert f"ID: {activity['id']}" in output
+                    # Should exit with code 0 on success
+                    assert e.value.code == 0
 
     def test_download_command_with_id(self, mock_config_file, temp_cache_dir, mock_fit_file):
         """Test downloading an activity by ID."""
@@ -74,7 +76,7 @@ class TestCommandLine:
                         # Should exit with code 0 on success
                         assert e.value.code == 0
 
-    def test_download_command_list_only(self, mock_config_file, temp_cache_dir, mock_activity_data):
+    def test_download_command_list_only(self, mock_config_file, temp_cache_dir, mock_activity_data, capsys):
         """Test displaying activity list when no index is provided."""
         with patch.object(sys, 'argv', [
             'fit_sync', 'download', '--account', 'garmin_us',
@@ -82,14 +84,15 @@ class TestCommandLine:
         ]):
             with patch('fit_sync.platforms.garmin.GarminPlatform.authenticate', return_value=True):
                 with patch('fit_sync.platforms.garmin.GarminPlatform.list_activities', return_value=mock_activity_data):
-                    with patch('builtins.print') as mock_print:
-                        with pytest.raises(SystemExit) as e:
-                            main_module.main()
-                        
-                        # Check that print was called with activity list
-                        assert mock_print.call_count > 0
-                        # Should exit with code 0 on success
-                        assert e.value.code == 0
+                    with pytest.raises(SystemExit) as e:
+                        main_module.main()
+                    
+                    # Check that the activity list was written to stdout
+                    output = capsys.readouterr().out
+                    assert "Activities from garmin_us:" in output
+                    assert "Use --index <number>" in output
+                    # Should exit with code 0 on success
+                    assert e.value.code == 0
 
     def test_download_command_with_output_dir(self, mock_config_file, temp_cache_dir, mock_activity_data, mock_fit_file):
         """Test downloading to a specific output directory."""
@@ -103,14 +106,13 @@ class TestCommandLine:
             with patch('fit_sync.platforms.garmin.GarminPlatform.authenticate', return_value=True):
                 with patch('fit_sync.platforms.garmin.GarminPlatform.list_activities', return_value=mock_activity_data):
                     with patch('fit_sync.platforms.garmin.GarminPlatform.download_activity', return_value=mock_fit_file):
-                        with patch('shutil.copy') as mock_copy:
-                            with pytest.raises(SystemExit) as e:
-                                main_module.main()
-                            
-                            # Check that copy was called to the output directory
-                            mock_copy.assert_called_once()
-                            # Should exit with code 0 on success
-                            assert e.value.code == 0
+                        with pytest.raises(SystemExit) as e:
+                            main_module.main()
+                        
+                        # Check that the file was placed in the output directory
+                        assert len(os.listdir(output_dir)) == 1
+                        # Should exit with code 0 on success
+                        assert e.value.code == 0
 
     def test_sync_command(self, mock_config_file, temp_cache_dir):
         """Test the sync command."""
@@ -197,4 +199,91 @@ class TestCommandLine:
                 mock_download.assert_called_once_with('garmin_us', 'activity_1', output_dir=str(temp_cache_dir))
                 
                 # Should exit with code 0 on success
-                assert e.value.code == 0 
\ No newline at end of file
+                assert e.value.code == 0
+
+    @pytest.mark.parametrize("extra_args", [[], ['--auth-only'], ['--activities-only']])
+    def test_clear_cache_does_not_build_sync_manager(self, mock_config_file, temp_cache_dir, extra_args):
+        """Test that clear-cache runs without constructing SyncManager."""
+        with patch.object(sys, 'argv', [
+            'fit_sync', 'clear-cache', *extra_args,
+            '--config', str(mock_config_file)
+        ]):
+            with patch('fit_sync.sync.SyncManager.__init__') as mock_init:
+                with pytest.raises(SystemExit) as e:
+                    main_module.main()
+                
+                mock_init.assert_not_called()
+                assert e.value.code == 0
+
+    def test_build_parser_single_command(self, capsys):
+        """Test that only the requested subparser is built."""
+        parser = main_module.build_parser('list')
+        args = parser.parse_args(['list', '--account', 'garmin_us'])
+        assert args.command == 'list'
+        assert args.account == 'garmin_us'
+        
+        # Other commands are not registered on a single-command parser
+        with pytest.raises(SystemExit) as e:
+            parser.parse_args(['sync'])
+        assert e.value.code == 2
+        assert "invalid choice: 'sync'" in capsys.readouterr().err
+        
+        # The full parser accepts every command
+        full_parser = main_module.build_parser()
+        for command in main_module.COMMANDS:
+            extra_args = ['--account', 'garmin_us'] if command == 'download' else []
+            assert full_parser.parse_args([command, *extra_args]).command == command
+
+    @pytest.mark.parametrize("command", ['list', 'download', 'sync'])
+    def test_invalid_date_rejected(self, mock_config_file, command, capsys):
+        """Test that a malformed date is rejected before any platform is queried."""
+        extra_args = ['--account', 'garmin_us'] if command == 'download' else []
+        with patch.object(sys, 'argv', [
+            'fit_sync', command, *extra_args, '--start-date', '2024/01/01',
+            '--config', str(mock_config_file)
+        ]):
+            with patch('fit_sync.sync.SyncManager.__init__') as mock_init:
+                with pytest.raises(SystemExit) as e:
+                    main_module.main()
+                
+                mock_init.assert_not_called()
+                assert e.value.code == 2
+                assert "invalid date '2024/01/01'" in capsys.readouterr().err
+
+    def test_invalid_config_json(self, temp_cache_dir):
+        """Test handling of a configuration file that is not valid JSON."""
+        config_file = temp_cache_dir / "bad_config.json"
+        config_file.write_text("{not valid json")
+        
+        with patch.object(sys, 'argv', ['fit_sync', 'auth', '--config', str(config_file)]):
+            with pytest.raises(SystemExit) as e:
+                main_module.main()
+            
+            assert e.value.code == 1
+
+    def test_clear_cache_removes_files(self, mock_config_file, temp_cache_dir):
+        """Test that clear-cache deletes cached files and recreates the directory."""
+        auth_dir = temp_cache_dir / "auth"
+        auth_dir.mkdir()
+        (auth_dir / "coros_cn.json").write_text("{}")
+        (temp_cache_dir / "activity.fit").write_text("fit")
+        
+        with patch.object(sys, 'argv', [
+            'fit_sync', 'clear-cache', '--auth-only',
+            '--config', str(mock_config_file)
+        ]):
+            with pytest.raises(SystemExit) as e:
+                main_module.main()
+            assert e.value.code == 0
+        
+        assert not auth_dir.exists()
+        assert (temp_cache_dir / "activity.fit").exists()
+        
+        # Running again with nothing to delete should still succeed
+        with patch.object(sys, 'argv', [
+            'fit_sync', 'clear-cache', '--auth-only',
+            '--config', str(mock_config_file)
+        ]):
+            with pytest.raises(SystemExit) as e:
+                main_module.main()
+            assert e.value.code == 0
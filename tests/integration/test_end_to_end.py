@@ -2,7 +2,6 @@
 Integration tests for fit_sync.
 """
 
-import os
 import json
 import pytest
 from pathlib import Path
@@ -38,12 +37,8 @@ class TestEndToEnd:
         # Validate that sync would have processed activities
         assert sync_result > 0
         
-        # Verify cache files were created
-        assert os.path.exists(temp_cache_dir)
-        
         # Verify cache directory is not empty - should contain downloaded FIT files
-        cache_contents = list(temp_cache_dir.glob("*.fit"))
-        assert len(cache_contents) > 0
+        assert any(temp_cache_dir.glob("*.fit"))
 
     def test_rule_based_sync(self, mock_config, temp_cache_dir):
         """Test sync based on configured rules."""
@@ -69,8 +64,7 @@ class TestEndToEnd:
         assert sync_result > 0
         
         # Verify files in cache directory (should be mostly running activities)
-        fit_files = list(temp_cache_dir.glob("*.fit"))
-        assert len(fit_files) > 0
+        assert any(temp_cache_dir.glob("*.fit"))
 
     def test_filtered_sync(self, mock_config, temp_cache_dir):
         """Test sync with command-line filters overriding config rules."""
@@ -105,6 +99,8 @@ class TestEndToEnd:
         # Verify sync would have processed activities
         assert sync_result > 0
         
-        # Verify only trail_running activities were processed
-        calls = manager.platforms["coros_cn"].download_activity.call_args_list
-        assert len(calls) == 2  # Only the 2 trail_running activities 
\ No newline at end of file
+        # Verify only the 2 trail_running activities were processed
+        download_activity = manager.platforms["coros_cn"].download_activity
+        assert download_activity.call_count == 2
+        download_activity.assert_any_call("activity_1")
+        download_activity.assert_any_call("activity_2") 
\ No newline at end of file
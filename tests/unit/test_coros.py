@@ -2,7 +2,8 @@
 Unit tests for Coros platform implementation.
 """
 
-import os
+import json
+import datetime
 import pytest
 import requests
 from pathlib import Path
@@ -10,131 +11,258 @@ from unittest.mock import patch, MagicMock
 
 from fit_sync.platforms.coros import CorosPlatform, CorosCNPlatform
 
+# A start date no stub activity can match, computed once at import
+FUTURE_DATE = (datetime.date.today() + datetime.timedelta(days=10)).isoformat()
+
+# API response payloads shared by the tests below
+_LOGIN_PAYLOAD = {
+    "code": 200,
+    "data": {
+        "token": "mock_token_123",
+        "userId": "user_123",
+        "email": "test@example.com"
+    }
+}
+
+_CN_LOGIN_PAYLOAD = {
+    "result": "0000",
+    "message": "OK",
+    "data": {
+        "accessToken": "mock_cn_token_123",
+        "userId": "user_cn_123",
+        "email": "test@example.com"
+    }
+}
+
+_CN_LIST_PAYLOAD = {
+    "apiCode": "C33BB719",
+    "result": "0000",
+    "message": "OK",
+    "data": {
+        "count": 1854,
+        "dataList": [
+            {
+                "adjustedPace": 0,
+                "ascent": 3701,
+                "avgCadence": 90,
+                "avgHr": 104,
+                "avgPower": 139,
+                "avgSpeed": 816.81,
+                "calorie": 5818000,
+                "date": 20250323,
+                "descent": 3616,
+                "distance": 69282.4296875,
+                "endTime": 1742737890,
+                "labelId": "467870248094171141",
+                "mode": 15,
+                "sportType": 102,
+                "startTime": 1742680814,
+                "step": 98934,
+                "workoutTime": 56590
+            },
+            {
+                "adjustedPace": 0,
+                "ascent": 0,
+                "avgCadence": 166,
+                "avgHr": 109,
+                "avgPower": 325,
+                "avgSpeed": 357.23,
+                "calorie": 212000,
+                "date": 20250321,
+                "descent": 0,
+                "distance": 5050.0,
+                "endTime": 1742533550,
+                "labelId": "467870244870848516",
+                "mode": 8,
+                "sportType": 101,
+                "startTime": 1742531746,
+                "step": 5008,
+                "workoutTime": 1804
+            }
+        ],
+        "pageNumber": 1,
+        "totalPage": 93
+    }
+}
+
+_CN_EMPTY_LIST_PAYLOAD = {
+    "result": "0000",
+    "message": "OK",
+    "data": {"dataList": []}
+}
+
+_CN_SINGLE_ACTIVITY_PAYLOAD = {
+    "result": "0000",
+    "message": "OK",
+    "data": {"dataList": [
+        {"labelId": "123", "startTime": 1742457600, "sportType": 100,
+         "totalTime": 3600, "distance": 10000}
+    ]}
+}
+
+
+def _minimal_list_payload(sport_type):
+    """Build a CN list payload with one activity holding only the fields the mapper needs."""
+    return {
+        "result": "0000",
+        "message": "OK",
+        "data": {"dataList": [{"labelId": "1", "startTime": 1742680814, "sportType": sport_type}]}
+    }
+
+
+def _mock_response(status_code=200):
+    """Build a mock API response limited to the requests.Response interface."""
+    response = MagicMock(spec=requests.Response)
+    response.status_code = status_code
+    return response
+
+
+def _json_response(payload, status_code=200):
+    """Build a mock API response whose body is the JSON-encoded payload."""
+    response = _mock_response(status_code)
+    response.content = json.dumps(payload).encode()
+    return response
+
+
+@pytest.fixture(autouse=True, scope="module")
+def coros_logger():
+    """Replace the Coros module logger with a mock for the whole module."""
+    import fit_sync.platforms.coros as coros
+    original = coros.logger
+    coros.logger = MagicMock()
+    yield coros.logger
+    coros.logger = original
+
+
+@pytest.fixture(scope="module")
+def coros_platform(credentials, tmp_path_factory):
+    """Base Coros platform shared by the tests that leave its state untouched."""
+    return CorosPlatform(credentials, str(tmp_path_factory.mktemp("coros")))
+
+
+@pytest.fixture
+def mock_session():
+    """Stand-in HTTP session, injected instead of patching requests.Session."""
+    return MagicMock(spec=requests.Session)
+
+
+@pytest.fixture
+def coros_cn_platform(credentials, temp_cache_dir, mock_session):
+    """Coros CN platform; tests set its token and caches, so each gets its own."""
+    return CorosCNPlatform(credentials, str(temp_cache_dir), session=mock_session)
+
 
 class TestCorosPlatform:
     """Tests for the base CorosPlatform class."""
 
-    def test_init(self, temp_cache_dir):
+    def test_init(self, shared_cache_dir, credentials):
         """Test initialization of CorosPlatform."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosPlatform(credentials, str(temp_cache_dir))
+        platform = CorosPlatform(credentials, str(shared_cache_dir))
         
         assert platform.email == "test@example.com"
         assert platform.password == "test_password"
-        assert platform.cache_dir == temp_cache_dir
+        assert platform.cache_dir == shared_cache_dir
         assert isinstance(platform.session, requests.Session)
         assert platform.token is None
-        assert os.path.exists(temp_cache_dir)
 
-    def test_authenticate(self, temp_cache_dir):
-        """Test authenticate method."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosPlatform(credentials, str(temp_cache_dir))
+    def test_cache_dir_created(self, temp_cache_dir, credentials):
+        """Test that the platform creates a missing cache directory."""
+        cache_dir = temp_cache_dir / "nested" / "cache"
+        CorosPlatform(credentials, str(cache_dir))
+        
+        assert cache_dir.exists()
+
+    @pytest.mark.parametrize("platform_cls, payload, expected_token, expected_user", [
+        pytest.param(CorosPlatform, _LOGIN_PAYLOAD, "mock_token_123", "user_123", id="global"),
+        pytest.param(CorosCNPlatform, _CN_LOGIN_PAYLOAD, "mock_cn_token_123", "user_cn_123", id="cn"),
+    ])
+    def test_authenticate(self, platform_cls, payload, expected_token, expected_user,
+                          temp_cache_dir, credentials, mock_session, coros_logger):
+        """Test authenticate method for the global and CN platforms."""
+        platform = platform_cls(credentials, str(temp_cache_dir), session=mock_session)
         
         # Mock the response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "code": 200,
-            "data": {
-                "token": "mock_token_123",
-                "userId": "user_123",
-                "email": "test@example.com"
-            }
-        }
-        
-        # Mock the token caching functions to avoid file operations
-        with patch('fit_sync.platforms.coros.logger') as mock_logger, \
-             patch('requests.Session.post', return_value=mock_response), \
-             patch.object(platform, '_save_token_to_cache') as mock_save, \
-             patch.object(platform, '_load_cached_token', return_value=False):
-            
-            # First call should authenticate via API
-            result = platform.authenticate()
-            
-            mock_logger.info.assert_called()
-            assert result is True
-            assert platform.token == "mock_token_123"
-            assert platform.user_id == "user_123"
-            mock_save.assert_called_once()
-            
+        platform.session.post.return_value = _json_response(payload)
+        
+        # Stub the token caching functions to avoid file operations; the
+        # platform is local to this test, so nothing needs restoring
+        platform._save_token_to_cache = mock_save = MagicMock()
+        platform._load_cached_token = MagicMock(return_value=False)
+        coros_logger.reset_mock()
+        
+        # First call should authenticate via API
+        result = platform.authenticate()
+        
+        coros_logger.info.assert_called()
+        assert result is True
+        assert platform.token == expected_token
+        assert platform.user_id == expected_user
+        mock_save.assert_called_once()
+        
         # Now test with cached token
-        platform2 = CorosPlatform(credentials, str(temp_cache_dir))
-        with patch('fit_sync.platforms.coros.logger') as mock_logger, \
-             patch.object(platform2, '_load_cached_token', return_value=True) as mock_load:
-            # Second call should use cached token
-            result = platform2.authenticate()
-            assert result is True
-            mock_load.assert_called_once()
-            mock_logger.info.assert_called()
-
-    def test_list_activities_no_filter(self, temp_cache_dir):
-        """Test listing activities without filters."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosPlatform(credentials, str(temp_cache_dir))
+        platform2 = platform_cls(credentials, str(temp_cache_dir))
+        platform2._load_cached_token = mock_load = MagicMock(return_value=True)
+        coros_logger.reset_mock()
         
-        activities = platform.list_activities(limit=3)
+        # Second call should use cached token
+        result = platform2.authenticate()
+        assert result is True
+        mock_load.assert_called_once()
+        coros_logger.info.assert_called()
+
+    @pytest.mark.parametrize("kwargs, check", [
+        pytest.param({"limit": 3}, lambda activities: len(activities) == 3, id="no_filter"),
+        pytest.param({"limit": -1}, lambda activities: activities == [], id="negative_limit"),
+        pytest.param(
+            {"limit": 10, "activity_type": "trail_running"},
+            lambda activities: activities and all(a["activityType"] == "trail_running" for a in activities),
+            id="type_filter"
+        ),
+        # No activities should be returned with a future date filter
+        pytest.param(
+            {"limit": 10, "start_date": FUTURE_DATE},
+            lambda activities: activities == [],
+            id="future_start_date"
+        ),
+    ])
+    def test_list_activities(self, coros_platform, kwargs, check):
+        """Test listing activities with and without filters."""
+        activities = coros_platform.list_activities(**kwargs)
         
-        assert len(activities) == 3
+        assert check(activities)
         for activity in activities:
-            assert "id" in activity
-            assert "startTime" in activity
-            assert "activityType" in activity
-            assert "duration" in activity
-            assert "distance" in activity
+            assert {"id", "startTime", "activityType", "duration", "distance"} <= activity.keys()
             # Check that IDs have the COROS prefix
             assert activity["id"].startswith("COROS_")
 
-    def test_list_activities_with_type_filter(self, temp_cache_dir):
-        """Test listing activities with activity type filter."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosPlatform(credentials, str(temp_cache_dir))
+    def test_list_activities_with_date_range(self, coros_platform):
+        """Test that start and end date filters bound the stub activities."""
+        today = datetime.date.today()
+        start = (today - datetime.timedelta(days=10)).isoformat()
+        end = (today - datetime.timedelta(days=2)).isoformat()
         
-        activities = platform.list_activities(limit=10, activity_type="trail_running")
+        activities = coros_platform.list_activities(limit=10, start_date=start, end_date=end)
         
-        assert len(activities) > 0
-        for activity in activities:
-            assert activity["activityType"] == "trail_running"
+        # Stub activities are 3 days apart, so only days 3, 6 and 9 ago match
+        assert [a["startTime"][:10] for a in activities] == [
+            (today - datetime.timedelta(days=days)).isoformat() for days in (3, 6, 9)
+        ]
 
-    def test_list_activities_with_date_filter(self, temp_cache_dir):
-        """Test listing activities with date filters."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosPlatform(credentials, str(temp_cache_dir))
+    @pytest.mark.parametrize("kwargs", [
+        pytest.param({"start_date": "2024/01/01"}, id="start_date"),
+        pytest.param({"end_date": "yesterday"}, id="end_date"),
+    ])
+    def test_list_activities_invalid_date(self, coros_platform, coros_logger, kwargs):
+        """Test that a malformed date filter is reported instead of raising."""
+        coros_logger.reset_mock()
         
-        # Get today's date and a future date
-        import datetime
-        today = datetime.datetime.now().strftime("%Y-%m-%d")
-        future = (datetime.datetime.now() + datetime.timedelta(days=10)).strftime("%Y-%m-%d")
+        assert coros_platform.list_activities(limit=10, **kwargs) == []
+        coros_logger.error.assert_called_once()
         
-        # No activities should be returned with a future date filter
-        activities = platform.list_activities(limit=10, start_date=future)
-        assert len(activities) == 0
-
-    def test_download_activity(self, temp_cache_dir):
+    def test_download_activity(self, coros_platform):
         """Test downloading an activity."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosPlatform(credentials, str(temp_cache_dir))
-        
         activity_id = "COROS_12345678"
-        fit_file = platform.download_activity(activity_id)
+        fit_file = coros_platform.download_activity(activity_id)
         
         assert fit_file is not None
         assert fit_file.exists()
@@ -149,237 +277,336 @@ class TestCorosPlatform:
 class TestCorosCNPlatform:
     """Tests for the CorosCNPlatform class."""
 
-    def test_init(self, temp_cache_dir):
+    def test_init(self, shared_cache_dir, credentials):
         """Test initialization of CorosCNPlatform."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosCNPlatform(credentials, str(temp_cache_dir))
+        platform = CorosCNPlatform(credentials, str(shared_cache_dir))
         
         assert platform.email == "test@example.com"
         assert platform.password == "test_password"
-        assert platform.cache_dir == temp_cache_dir
+        assert platform.cache_dir == shared_cache_dir
         assert platform.base_url == "https://teamapi.coros.com"
         assert platform.web_url == "https://t.coros.com"
-        assert platform.token_cache_file == platform.cache_dir / "coros_cn_token.json"
+        assert platform.token_cache_file == platform.cache_dir / "auth" / "coros_cn.json"
         
-    def test_authenticate(self, temp_cache_dir):
-        """Test CN platform authenticate method."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosCNPlatform(credentials, str(temp_cache_dir))
-        
-        # Mock the response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "result": "0000",
-            "message": "OK",
-            "data": {
-                "accessToken": "mock_cn_token_123",
-                "userId": "user_cn_123",
-                "email": "test@example.com"
-            }
-        }
-        
-        # Mock the token caching functions to avoid file operations
-        with patch('fit_sync.platforms.coros.logger') as mock_logger, \
-             patch('requests.Session.post', return_value=mock_response), \
-             patch.object(platform, '_save_token_to_cache') as mock_save, \
-             patch.object(platform, '_load_cached_token', return_value=False):
-            
-            # First call should authenticate via API
-            result = platform.authenticate()
-            
-            mock_logger.info.assert_called()
-            assert result is True
-            assert platform.token == "mock_cn_token_123"
-            assert platform.user_id == "user_cn_123"
-            mock_save.assert_called_once()
-            
-        # Now test with cached token
-        platform2 = CorosCNPlatform(credentials, str(temp_cache_dir))
-        with patch('fit_sync.platforms.coros.logger') as mock_logger, \
-             patch.object(platform2, '_load_cached_token', return_value=True) as mock_load:
-            # Second call should use cached token
-            result = platform2.authenticate()
-            assert result is True
-            mock_load.assert_called_once()
-            mock_logger.info.assert_called()
-    
-    def test_list_activities_cn(self, temp_cache_dir):
+    def test_list_activities_cn(self, coros_cn_platform):
         """Test list_activities method for Coros CN platform."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosCNPlatform(credentials, str(temp_cache_dir))
-        platform.token = "mock_token_123"  # Set token directly to avoid authentication
+        coros_cn_platform.token = "mock_token_123"  # Set token directly to avoid authentication
         
         # Mock API response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "apiCode": "C33BB719",
-            "result": "0000",
-            "message": "OK",
-            "data": {
-                "count": 1854,
-                "dataList": [
-                    {
-                        "adjustedPace": 0,
-                        "ascent": 3701,
-                        "avgCadence": 90,
-                        "avgHr": 104,
-                        "avgPower": 139,
-                        "avgSpeed": 816.81,
-                        "calorie": 5818000,
-                        "date": 20250323,
-                        "descent": 3616,
-                        "distance": 69282.4296875,
-                        "endTime": 1742737890,
-                        "labelId": "467870248094171141",
-                        "mode": 15,
-                        "sportType": 102,
-                        "startTime": 1742680814,
-                        "step": 98934,
-                        "workoutTime": 56590
-                    },
-                    {
-                        "adjustedPace": 0,
-                        "ascent": 0,
-                        "avgCadence": 166,
-                        "avgHr": 109,
-                        "avgPower": 325,
-                        "avgSpeed": 357.23,
-                        "calorie": 212000,
-                        "date": 20250321,
-                        "descent": 0,
-                        "distance": 5050.0,
-                        "endTime": 1742533550,
-                        "labelId": "467870244870848516",
-                        "mode": 8,
-                        "sportType": 101,
-                        "startTime": 1742531746,
-                        "step": 5008,
-                        "workoutTime": 1804
-                    }
-                ],
-                "pageNumber": 1,
-                "totalPage": 93
-            }
-        }
-        
-        # Mock get request
-        with patch('fit_sync.platforms.coros.logger'), \
-             patch('requests.Session.get', return_value=mock_response):
-            
-            # Test the list_activities method
-            activities = platform.list_activities(limit=10)
-            
-            # Verify the results
-            assert len(activities) == 2
-            
-            # Verify first activity
-            assert activities[0]["id"] == "COROS_CN_467870248094171141"
-            assert "trail_running" in activities[0]["activityType"]  # Sport type 102 should map to trail_running
-            assert "69.28" in activities[0]["distance"]  # Distance should be in km
-            assert activities[0]["avgHR"] == 104
-            assert activities[0]["elevationGain"] == "3701 m"
-            
-            # Verify second activity
-            assert activities[1]["id"] == "COROS_CN_467870244870848516"
-            assert "treadmill" in activities[1]["activityType"]  # Sport type 101 should map to treadmill
-            assert "5.05" in activities[1]["distance"]
+        mock_response = _json_response(_CN_LIST_PAYLOAD)
+        coros_cn_platform.session.get.return_value = mock_response
+        
+        # Test the list_activities method
+        activities = coros_cn_platform.list_activities(limit=10)
+        
+        # Verify the results
+        assert len(activities) == 2
+        
+        # Verify first activity
+        assert activities[0]["id"] == "COROS_CN_467870248094171141"
+        assert activities[0]["activityType"] == "trail_running"  # Sport type 102 should map to trail_running
+        assert activities[0]["distance"] == "69.28 km"  # Distance should be in km
+        assert activities[0]["avgHR"] == 104
+        assert activities[0]["elevationGain"] == "3701 m"
+        assert activities[0]["duration"] == "15:43:10"  # workoutTime 56590 seconds
+        assert activities[0]["startTime"] == datetime.datetime.fromtimestamp(1742680814).strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Verify second activity
+        assert activities[1]["id"] == "COROS_CN_467870244870848516"
+        assert activities[1]["activityType"] == "treadmill"  # Sport type 101 should map to treadmill
+        assert activities[1]["distance"] == "5.05 km"
     
-    def test_download_activity_cn(self, temp_cache_dir):
+    def test_download_activity_cn(self, coros_cn_platform):
         """Test downloading a FIT file from Coros CN platform."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosCNPlatform(credentials, str(temp_cache_dir))
-        platform.token = "mock_token_123"  # Set token directly to avoid authentication
+        coros_cn_platform.token = "mock_token_123"  # Set token directly to avoid authentication
         
         # Create mock binary content for FIT file
         mock_fit_content = b'\x0E\x10\x1C\xE82FIT\x00\x00\x00\x00\x00\x00\x00'
         
         # Mock API response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
+        mock_response = _mock_response()
         mock_response.iter_content.return_value = [mock_fit_content]
         
         activity_id = "COROS_CN_467870248094171141"
         
-        # Mock get request with context manager to ensure any file is cleaned up
-        with patch('fit_sync.platforms.coros.logger'), \
-             patch('requests.Session.get', return_value=mock_response):
-            
-            # Test the download_activity method
-            fit_file = platform.download_activity(activity_id)
-            
-            # Verify the result
-            assert fit_file is not None
-            assert fit_file.exists()
-            assert fit_file.name == f"{activity_id}.fit"
-            
-            # Verify file content (binary)
-            with open(fit_file, 'rb') as f:
-                content = f.read()
-                assert content == mock_fit_content
-        
-    def test_coros_different_activity_types(self, temp_cache_dir):
-        """Test that Coros uses different activity types than Garmin."""
-        credentials = {
+        coros_cn_platform.session.get.return_value = mock_response
+        
+        # Test the download_activity method
+        fit_file = coros_cn_platform.download_activity(activity_id)
+        
+        # Verify the result
+        assert fit_file is not None
+        assert fit_file.exists()
+        assert fit_file.name == f"{activity_id}.fit"
+        
+        # Verify file content (binary)
+        with open(fit_file, 'rb') as f:
+            content = f.read()
+            assert content == mock_fit_content
+        
+    @pytest.mark.parametrize("sport_type, expected", [
+        (100, "running"),
+        (101, "treadmill"),
+        (102, "trail_running"),
+        (111, "mountaineering"),
+        (999, "other"),
+    ])
+    def test_sport_type_mapping(self, coros_cn_platform, sport_type, expected):
+        """Test that Coros sport types map to Coros-specific activity types."""
+        coros_cn_platform.token = "mock_token_123"  # Set token directly to avoid authentication
+        coros_cn_platform.session.get.return_value = _json_response(_minimal_list_payload(sport_type))
+        
+        activities = coros_cn_platform.list_activities(limit=1)
+        
+        assert activities[0]["activityType"] == expected
+
+    def test_password_hashed_once(self, coros_cn_platform):
+        """Test that the password hash is computed at construction and reused."""
+        import hashlib
+        
+        assert coros_cn_platform._pwd_md5 == hashlib.md5(b"test_password").hexdigest()
+        
+        mock_response = _mock_response(500)
+        mock_post = coros_cn_platform.session.post
+        mock_post.return_value = mock_response
+        with patch('hashlib.md5') as mock_md5:
+            coros_cn_platform.authenticate()
+            mock_md5.assert_not_called()
+        
+        assert mock_post.call_args[1]['json']['pwd'] == coros_cn_platform._pwd_md5
+        
+    def test_token_cache_roundtrip(self, coros_cn_platform, temp_cache_dir, credentials):
+        """Test that a saved token is reused by a new instance."""
+        coros_cn_platform.token = "cached_token_123"
+        coros_cn_platform.user_id = "user_cn_123"
+        coros_cn_platform._save_token_to_cache({})
+        
+        assert (temp_cache_dir / "auth" / "coros_cn.json").exists()
+        
+        # Drop the in-memory copy so the token is read back from disk
+        CorosPlatform._token_cache.clear()
+        platform2 = CorosCNPlatform(credentials, str(temp_cache_dir), session=MagicMock(spec=requests.Session))
+        assert platform2.authenticate() is True
+        platform2.session.post.assert_not_called()
+        
+        assert platform2.token == "cached_token_123"
+        assert platform2.user_id == "user_cn_123"
+
+    def test_token_cache_legacy_expiry(self, coros_cn_platform, temp_cache_dir, credentials):
+        """Test that cache files with an ISO expiry time are still honoured."""
+        coros_cn_platform.token_cache_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        expiry = datetime.datetime.now() + datetime.timedelta(hours=1)
+        coros_cn_platform.token_cache_file.write_text(json.dumps({
             "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = CorosCNPlatform(credentials, str(temp_cache_dir))
-        platform.token = "mock_token_123"  # Set token directly to avoid authentication
-        
-        # Mock API response with specific activity types
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "result": "0000",
-            "message": "OK",
-            "data": {
-                "count": 10,
-                "dataList": [
-                    {
-                        "sportType": 102,  # trail_running
-                        "startTime": 1742680814,
-                        "distance": 10000.0,
-                        "labelId": "123456789",
-                        "workoutTime": 3600
-                    },
-                    {
-                        "sportType": 111,  # mountaineering
-                        "startTime": 1742531746,
-                        "distance": 5000.0,
-                        "labelId": "987654321",
-                        "workoutTime": 1800
-                    }
-                ],
-                "pageNumber": 1,
-                "totalPage": 1
-            }
-        }
-        
-        # Mock get request
-        with patch('fit_sync.platforms.coros.logger'), \
-             patch('requests.Session.get', return_value=mock_response):
-             
-            activities = platform.list_activities(limit=10)
-            
-            # Check that Coros-specific activity types are used
-            found_types = set()
-            for activity in activities:
-                found_types.add(activity["activityType"])
-            
-            # Should find at least one Coros-specific activity type
-            coros_types = ["trail_running", "mountaineering"]
-            assert any(t in found_types for t in coros_types) 
\ No newline at end of file
+            "token": "legacy_token",
+            "user_id": "user_cn_123",
+            "expiry_time": expiry.isoformat()
+        }))
+        assert coros_cn_platform._load_cached_token() is True
+        assert coros_cn_platform.token == "legacy_token"
+        
+        # An expired legacy entry is ignored
+        CorosPlatform._token_cache.clear()
+        platform2 = CorosCNPlatform(credentials, str(temp_cache_dir))
+        expired = datetime.datetime.now() - datetime.timedelta(hours=1)
+        platform2.token_cache_file.write_text(json.dumps({
+            "email": "test@example.com",
+            "token": "legacy_token",
+            "expiry_time": expired.isoformat()
+        }))
+        assert platform2._load_cached_token() is False
+
+    def test_session_pooling(self, temp_cache_dir, credentials):
+        """Test that the CN session mounts a pooled adapter with retries."""
+        coros_cn_platform = CorosCNPlatform(credentials, str(temp_cache_dir))
+        
+        adapter = coros_cn_platform.session.get_adapter("https://teamcnapi.coros.com")
+        assert adapter._pool_maxsize == 32
+        assert adapter.max_retries.total == 3
+        assert "user-agent" in coros_cn_platform.session.headers
+
+    def test_token_cache_in_memory(self, coros_cn_platform, temp_cache_dir, credentials):
+        """Test that a cached token is reused without reading the cache file."""
+        coros_cn_platform.token = "cached_token_123"
+        coros_cn_platform.user_id = "user_cn_123"
+        coros_cn_platform._save_token_to_cache({})
+        
+        platform2 = CorosCNPlatform(credentials, str(temp_cache_dir))
+        with patch.object(platform2, '_read_token_file') as mock_read:
+            assert platform2._load_cached_token() is True
+            mock_read.assert_not_called()
+        
+        assert platform2.token == "cached_token_123"
+        
+        # Once loaded, the instance does not consult the shared cache again
+        CorosPlatform._token_cache.clear()
+        assert platform2._load_cached_token() is True
+
+    def test_session_reused_across_requests(self, coros_cn_platform):
+        """Test that listing and downloading go through the platform's one session."""
+        coros_cn_platform.token = "mock_token_123"  # Set token directly to avoid authentication
+        session = coros_cn_platform.session
+        
+        mock_response = _json_response(_CN_SINGLE_ACTIVITY_PAYLOAD)
+        mock_response.iter_content.return_value = [b'FIT']
+        session.get.return_value = mock_response
+        
+        with patch('requests.Session') as mock_session_class:
+            coros_cn_platform.list_activities(limit=1)
+            coros_cn_platform.download_activity("COROS_CN_123")
+            mock_session_class.assert_not_called()
+        
+        assert coros_cn_platform.session is session
+        assert session.get.call_count == 2
+
+    def test_session_keeps_connections_alive(self, shared_cache_dir, credentials):
+        """Test that the shared session does not ask servers to close connections."""
+        platform = CorosCNPlatform(credentials, str(shared_cache_dir))
+        
+        assert platform.session.headers.get("Connection", "").lower() != "close"
+
+    def test_session_returns_exhausted_retries(self, shared_cache_dir, credentials):
+        """Test that a 5xx left after the last retry is returned, not raised as RetryError."""
+        platform = CorosCNPlatform(credentials, str(shared_cache_dir))
+        retries = platform.session.get_adapter(platform.base_url).max_retries
+        
+        assert 503 in retries.status_forcelist
+        assert retries.raise_on_status is False
+
+    def test_session_shared_between_instances(self, temp_cache_dir, credentials):
+        """Test that platform instances share one pooled session without auth headers."""
+        coros_cn_platform = CorosCNPlatform(credentials, str(temp_cache_dir))
+        platform2 = CorosPlatform(credentials, str(temp_cache_dir))
+        
+        coros_cn_platform.token = "mock_token_123"
+        coros_cn_platform._set_auth_headers()
+        
+        assert coros_cn_platform.session is platform2.session
+        assert coros_cn_platform._auth_headers == {"accesstoken": "mock_token_123"}
+        assert "accesstoken" not in coros_cn_platform.session.headers
+
+    def test_download_activities_cn(self, coros_cn_platform, temp_cache_dir):
+        """Test downloading several FIT files concurrently."""
+        coros_cn_platform.token = "mock_token_123"  # Set token directly to avoid authentication
+        
+        mock_response = _mock_response()
+        mock_response.iter_content.return_value = [b'FIT']
+        
+        mock_get = coros_cn_platform.session.get
+        mock_get.return_value = mock_response
+        
+        activity_ids = [f"COROS_CN_{i}" for i in range(5)]
+        results = coros_cn_platform.download_activities(activity_ids)
+        
+        assert mock_get.call_count == 5
+        assert list(results) == activity_ids
+        for activity_id, fit_file in results.items():
+            assert fit_file == temp_cache_dir / f"{activity_id}.fit"
+            assert fit_file.read_bytes() == b'FIT'
+    
+    def test_download_activity_cn_interrupted(self, coros_cn_platform, temp_cache_dir):
+        """Test that an interrupted download leaves no partial file behind."""
+        coros_cn_platform.token = "mock_token_123"  # Set token directly to avoid authentication
+        
+        def broken_stream(chunk_size):
+            yield b'partial'
+            raise IOError("connection reset")
+        
+        mock_response = _mock_response()
+        mock_response.iter_content.side_effect = broken_stream
+        coros_cn_platform.session.get.return_value = mock_response
+        
+        fit_file = coros_cn_platform.download_activity("COROS_CN_123")
+        
+        assert fit_file is None
+        assert list(temp_cache_dir.glob("COROS_CN_123*")) == []
+
+    def test_list_activities_cn_mode_filter(self, coros_cn_platform):
+        """Test that activity type filters map to de-duplicated Coros mode codes."""
+        coros_cn_platform.token = "mock_token_123"  # Set token directly to avoid authentication
+        
+        mock_response = _json_response(_CN_EMPTY_LIST_PAYLOAD)
+        
+        mock_get = coros_cn_platform.session.get
+        mock_get.return_value = mock_response
+        
+        coros_cn_platform.list_activities(activity_type="running,trail_running,cycling,unknown",
+                                          start_date="2025-03-01", end_date="2025-03-31")
+        
+        params = mock_get.call_args[1]['params']
+        assert params['modeList'] == "8,15"
+        assert params['startDate'] == "20250301"
+        assert params['endDate'] == "20250331"
+    
+    def test_list_activities_cn_cached(self, coros_cn_platform):
+        """Test that identical list queries within the TTL reuse the previous result."""
+        coros_cn_platform.token = "mock_token_123"  # Set token directly to avoid authentication
+        
+        mock_response = _json_response(_CN_SINGLE_ACTIVITY_PAYLOAD)
+        
+        mock_get = coros_cn_platform.session.get
+        mock_get.return_value = mock_response
+        
+        first = coros_cn_platform.list_activities(limit=5)
+        second = coros_cn_platform.list_activities(limit=5)
+        coros_cn_platform.list_activities(limit=6)
+        
+        assert first == second
+        assert first is not second
+        assert mock_get.call_count == 2
+    
+    def test_request_reauthenticates_on_401(self, coros_cn_platform):
+        """Test that a rejected token is invalidated and the request retried once."""
+        coros_cn_platform.token = "expired_token"
+        coros_cn_platform._set_auth_headers()
+        
+        rejected = _mock_response(401)
+        accepted = _mock_response(200)
+        
+        def fake_authenticate():
+            coros_cn_platform.token = "fresh_token"
+            coros_cn_platform._set_auth_headers()
+            return True
+        
+        mock_get = coros_cn_platform.session.get
+        mock_get.side_effect = [rejected, accepted]
+        
+        with patch.object(coros_cn_platform, 'authenticate', side_effect=fake_authenticate) as mock_auth:
+            response = coros_cn_platform._request('get', "https://teamcnapi.coros.com/activity/query")
+        
+        assert response is accepted
+        mock_auth.assert_called_once()
+        assert mock_get.call_count == 2
+        retry_kwargs = mock_get.call_args[1]
+        assert retry_kwargs['headers']['accesstoken'] == "fresh_token"
+        assert retry_kwargs['cookies']['CPL-coros-token'] == "fresh_token"
+    
+    def test_ensure_token_authenticates_once(self, coros_cn_platform):
+        """Test that concurrent callers share a single authentication."""
+        import threading
+        import time
+        
+        def slow_authenticate():
+            time.sleep(0.05)
+            coros_cn_platform.token = "fresh_token"
+            return True
+        
+        with patch.object(coros_cn_platform, 'authenticate', side_effect=slow_authenticate) as mock_auth:
+            threads = [threading.Thread(target=coros_cn_platform._ensure_token) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        mock_auth.assert_called_once()
+        assert coros_cn_platform.token == "fresh_token"
+    
+    def test_authenticate_missing_credentials(self, temp_cache_dir, mock_session):
+        """Test that missing credentials fail before the token cache is read."""
+        platform = CorosCNPlatform({"email": "test@example.com"}, str(temp_cache_dir), session=mock_session)
+        
+        with patch.object(platform, '_load_cached_token') as mock_load:
+            assert platform.authenticate() is False
+            mock_load.assert_not_called()
+            mock_session.post.assert_not_called()
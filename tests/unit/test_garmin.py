@@ -2,53 +2,73 @@
 Unit tests for Garmin platform implementation.
 """
 
-import os
+import datetime
 import pytest
+import requests
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 from fit_sync.platforms.garmin import GarminPlatform, GarminUSPlatform, GarminCNPlatform
 
+# A start date no stub activity can match, computed once at import
+FUTURE_DATE = (datetime.date.today() + datetime.timedelta(days=10)).isoformat()
+
+
+@pytest.fixture
+def garmin_logger():
+    """Swap the Garmin module logger for a mock by plain assignment."""
+    import fit_sync.platforms.garmin as garmin
+    original = garmin.logger
+    garmin.logger = MagicMock()
+    yield garmin.logger
+    garmin.logger = original
+
+
+@pytest.fixture
+def garmin_platform(credentials, shared_cache_dir):
+    """Garmin platform for tests that do not write to its cache directory."""
+    return GarminPlatform(credentials, str(shared_cache_dir))
+
 
 class TestGarminPlatform:
     """Tests for the base GarminPlatform class."""
 
-    def test_init(self, temp_cache_dir):
+    def test_init(self, garmin_platform, shared_cache_dir):
         """Test initialization of GarminPlatform."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = GarminPlatform(credentials, str(temp_cache_dir))
+        assert garmin_platform.email == "test@example.com"
+        assert garmin_platform.password == "test_password"
+        assert garmin_platform.cache_dir == shared_cache_dir
+        assert isinstance(garmin_platform.session, requests.Session)
+
+    def test_cache_dir_created(self, temp_cache_dir, credentials):
+        """Test that the platform creates a missing cache directory."""
+        cache_dir = temp_cache_dir / "nested" / "cache"
+        GarminPlatform(credentials, str(cache_dir))
         
-        assert platform.email == "test@example.com"
-        assert platform.password == "test_password"
-        assert platform.cache_dir == temp_cache_dir
-        assert platform.session is None
-        assert os.path.exists(temp_cache_dir)
+        assert cache_dir.exists()
 
-    def test_authenticate(self, temp_cache_dir):
-        """Test authenticate method."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = GarminPlatform(credentials, str(temp_cache_dir))
+    def test_session_pooling(self, garmin_platform, shared_cache_dir, credentials):
+        """Test that the shared session pools HTTPS connections and can be closed."""
+        adapter = garmin_platform.session.get_adapter("https://connect.garmin.com")
+        assert adapter._pool_maxsize == 16
+        assert adapter.max_retries.total == 3
         
-        with patch('fit_sync.platforms.garmin.logger') as mock_logger:
-            result = platform.authenticate()
-            mock_logger.info.assert_called_once()
-            assert result is True
+        # All Garmin platforms share one connection pool
+        assert GarminCNPlatform(credentials, str(shared_cache_dir)).session is garmin_platform.session
+        
+        with patch.object(garmin_platform.session, 'close') as mock_close:
+            garmin_platform.close()
+            mock_close.assert_called_once()
+
+    def test_authenticate(self, garmin_platform, garmin_logger):
+        """Test authenticate method."""
+        result = garmin_platform.authenticate()
+        garmin_logger.info.assert_called_once()
+        assert result is True
 
-    def test_list_activities_no_filter(self, temp_cache_dir):
+    def test_list_activities_no_filter(self, garmin_platform):
         """Test listing activities without filters."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = GarminPlatform(credentials, str(temp_cache_dir))
-        
-        activities = platform.list_activities(limit=3)
+        activities = garmin_platform.list_activities(limit=3)
         
         assert len(activities) == 3
         for activity in activities:
@@ -58,43 +78,41 @@ class TestGarminPlatform:
             assert "duration" in activity
             assert "distance" in activity
 
-    def test_list_activities_with_type_filter(self, temp_cache_dir):
+    def test_list_activities_with_type_filter(self, garmin_platform):
         """Test listing activities with activity type filter."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = GarminPlatform(credentials, str(temp_cache_dir))
-        
-        activities = platform.list_activities(limit=10, activity_type="running")
+        activities = garmin_platform.list_activities(limit=10, activity_type="running")
         
         assert len(activities) > 0
         for activity in activities:
             assert activity["activityType"] == "running"
+        
+        # A filter that matches no known type yields no activities
+        assert garmin_platform.list_activities(limit=10, activity_type="unknown") == []
 
-    def test_list_activities_with_date_filter(self, temp_cache_dir):
+    def test_list_activities_with_date_filter(self, garmin_platform):
         """Test listing activities with date filters."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = GarminPlatform(credentials, str(temp_cache_dir))
-        
-        # Get today's date and a future date
-        import datetime
-        today = datetime.datetime.now().strftime("%Y-%m-%d")
-        future = (datetime.datetime.now() + datetime.timedelta(days=10)).strftime("%Y-%m-%d")
-        
         # No activities should be returned with a future date filter
-        activities = platform.list_activities(limit=10, start_date=future)
+        activities = garmin_platform.list_activities(limit=10, start_date=FUTURE_DATE)
         assert len(activities) == 0
-
-    def test_download_activity(self, temp_cache_dir):
+        
+        # An end date bounds the listing from the other side; activities are 2 days apart
+        end = (datetime.date.today() - datetime.timedelta(days=5)).isoformat()
+        activities = garmin_platform.list_activities(limit=5, end_date=end)
+        assert [a["startTime"][:10] for a in activities] == [
+            (datetime.date.today() - datetime.timedelta(days=days)).isoformat() for days in (6, 8)
+        ]
+
+    @pytest.mark.parametrize("kwargs", [
+        pytest.param({"start_date": "2024/01/01"}, id="start_date"),
+        pytest.param({"end_date": "yesterday"}, id="end_date"),
+    ])
+    def test_list_activities_invalid_date(self, garmin_platform, garmin_logger, kwargs):
+        """Test that a malformed date filter is reported instead of raising."""
+        assert garmin_platform.list_activities(limit=10, **kwargs) == []
+        garmin_logger.error.assert_called_once()
+    
+    def test_download_activity(self, temp_cache_dir, credentials):
         """Test downloading an activity."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
         platform = GarminPlatform(credentials, str(temp_cache_dir))
         
         activity_id = "test_activity_123"
@@ -109,20 +127,9 @@ class TestGarminPlatform:
             content = f.read()
             assert f"Mock FIT file for activity {activity_id}" in content
 
-    def test_upload_activity(self, temp_cache_dir):
+    def test_upload_activity(self, garmin_platform, mock_fit_file):
         """Test uploading an activity."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = GarminPlatform(credentials, str(temp_cache_dir))
-        
-        # Create a test FIT file
-        fit_file = temp_cache_dir / "test_upload.fit"
-        with open(fit_file, 'w') as f:
-            f.write("Test FIT file content")
-        
-        activity_id = platform.upload_activity(fit_file)
+        activity_id = garmin_platform.upload_activity(mock_fit_file)
         
         assert activity_id is not None
         assert isinstance(activity_id, str)
@@ -131,32 +138,24 @@ class TestGarminPlatform:
 class TestGarminUSPlatform:
     """Tests for the GarminUSPlatform class."""
 
-    def test_init(self, temp_cache_dir):
+    def test_init(self, shared_cache_dir, credentials):
         """Test initialization of GarminUSPlatform."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = GarminUSPlatform(credentials, str(temp_cache_dir))
+        platform = GarminUSPlatform(credentials, str(shared_cache_dir))
         
         assert platform.email == "test@example.com"
         assert platform.password == "test_password"
-        assert platform.cache_dir == temp_cache_dir
+        assert platform.cache_dir == shared_cache_dir
         assert platform.base_url == "https://connect.garmin.com"
 
 
 class TestGarminCNPlatform:
     """Tests for the GarminCNPlatform class."""
 
-    def test_init(self, temp_cache_dir):
+    def test_init(self, shared_cache_dir, credentials):
         """Test initialization of GarminCNPlatform."""
-        credentials = {
-            "email": "test@example.com",
-            "password": "test_password"
-        }
-        platform = GarminCNPlatform(credentials, str(temp_cache_dir))
+        platform = GarminCNPlatform(credentials, str(shared_cache_dir))
         
         assert platform.email == "test@example.com"
         assert platform.password == "test_password"
-        assert platform.cache_dir == temp_cache_dir
+        assert platform.cache_dir == shared_cache_dir
         assert platform.base_url == "https://connect.garmin.cn" 
\ No newline at end of file
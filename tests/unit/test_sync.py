@@ -4,8 +4,9 @@ Unit tests for sync manager implementation.
 
 import os
 import pytest
+from collections.abc import Mapping
 from pathlib import Path
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, Mock, call
 
 from fit_sync.sync import SyncManager
 from fit_sync.platforms.garmin import GarminUSPlatform, GarminCNPlatform
@@ -15,16 +16,16 @@ from fit_sync.platforms.coros import CorosCNPlatform
 class TestSyncManager:
     """Tests for the SyncManager class."""
 
-    def test_init(self, mock_config, temp_cache_dir):
+    def test_init(self, mock_config, shared_cache_dir):
         """Test initialization of SyncManager."""
         # Update cache directory in config
-        mock_config["cache"]["directory"] = str(temp_cache_dir)
+        mock_config["cache"]["directory"] = str(shared_cache_dir)
         
         manager = SyncManager(mock_config)
         
         assert manager.config == mock_config
-        assert manager.cache_dir == temp_cache_dir
-        assert isinstance(manager.platforms, dict)
+        assert manager.cache_dir == shared_cache_dir
+        assert isinstance(manager.platforms, Mapping)
         assert len(manager.platforms) == 3
         assert "garmin_us" in manager.platforms
         assert "garmin_cn" in manager.platforms
@@ -33,14 +34,27 @@ class TestSyncManager:
         assert isinstance(manager.platforms["garmin_cn"], GarminCNPlatform)
         assert isinstance(manager.platforms["coros_cn"], CorosCNPlatform)
 
-    def test_authenticate_all_success(self, mock_config, temp_cache_dir):
+    def test_platforms_built_lazily(self, mock_config, shared_cache_dir):
+        """Test that platforms are only constructed when first accessed."""
+        mock_config["cache"]["directory"] = str(shared_cache_dir)
+        
+        with patch('fit_sync.sync.CorosCNPlatform') as coros_cls:
+            manager = SyncManager(mock_config)
+            assert "coros_cn" in manager.platforms
+            coros_cls.assert_not_called()
+            
+            platform = manager.platforms["coros_cn"]
+            assert manager.platforms["coros_cn"] is platform
+            coros_cls.assert_called_once()
+
+    def test_authenticate_all_success(self, mock_config, shared_cache_dir):
         """Test authenticate_all method when all authentications succeed."""
-        mock_config["cache"]["directory"] = str(temp_cache_dir)
+        mock_config["cache"]["directory"] = str(shared_cache_dir)
         manager = SyncManager(mock_config)
         
         # Mock all platform authenticate methods to return True
         for platform_id, platform in manager.platforms.items():
-            platform.authenticate = MagicMock(return_value=True)
+            platform.authenticate = Mock(return_value=True)
         
         result = manager.authenticate_all()
         
@@ -48,15 +62,15 @@ class TestSyncManager:
         for platform_id, platform in manager.platforms.items():
             platform.authenticate.assert_called_once()
 
-    def test_authenticate_all_some_failure(self, mock_config, temp_cache_dir):
+    def test_authenticate_all_some_failure(self, mock_config, shared_cache_dir):
         """Test authenticate_all method when some authentications fail."""
-        mock_config["cache"]["directory"] = str(temp_cache_dir)
+        mock_config["cache"]["directory"] = str(shared_cache_dir)
         manager = SyncManager(mock_config)
         
         # Mock platform authenticate methods with mixed results
-        manager.platforms["garmin_us"].authenticate = MagicMock(return_value=True)
-        manager.platforms["garmin_cn"].authenticate = MagicMock(return_value=False)
-        manager.platforms["coros_cn"].authenticate = MagicMock(return_value=True)
+        manager.platforms["garmin_us"].authenticate = Mock(return_value=True)
+        manager.platforms["garmin_cn"].authenticate = Mock(return_value=False)
+        manager.platforms["coros_cn"].authenticate = Mock(return_value=True)
         
         result = manager.authenticate_all()
         
@@ -65,6 +79,31 @@ class TestSyncManager:
         manager.platforms["garmin_cn"].authenticate.assert_called_once()
         manager.platforms["coros_cn"].authenticate.assert_called_once()
 
+    def test_authenticate_all_concurrent(self, mock_config, shared_cache_dir):
+        """Test that authenticate_all logs in to platforms concurrently."""
+        import threading
+        mock_config["cache"]["directory"] = str(shared_cache_dir)
+        manager = SyncManager(mock_config)
+        
+        # Each login waits for all others; this only succeeds if they run in parallel
+        barrier = threading.Barrier(len(manager.platforms), timeout=5)
+        for platform in manager.platforms.values():
+            platform.authenticate = Mock(side_effect=lambda: barrier.wait() is not None)
+        
+        assert manager.authenticate_all() is True
+
+    def test_authenticate_all_error(self, mock_config, shared_cache_dir):
+        """Test that an exception from one platform counts as a failed login."""
+        mock_config["cache"]["directory"] = str(shared_cache_dir)
+        manager = SyncManager(mock_config)
+        
+        manager.platforms["garmin_us"].authenticate = Mock(return_value=True)
+        manager.platforms["garmin_cn"].authenticate = Mock(side_effect=RuntimeError("boom"))
+        manager.platforms["coros_cn"].authenticate = Mock(return_value=True)
+        
+        assert manager.authenticate_all() is False
+        manager.platforms["coros_cn"].authenticate.assert_called_once()
+
     def test_sync_with_config_rules(self, mock_config, temp_cache_dir, mock_fit_file):
         """Test sync method using rules from config."""
         mock_config["cache"]["directory"] = str(temp_cache_dir)
@@ -81,13 +120,13 @@ class TestSyncManager:
         ]
         
         # Mock platform methods
-        manager.platforms["garmin_us"].list_activities = MagicMock(return_value=garmin_us_activities)
-        manager.platforms["garmin_us"].download_activity = MagicMock(return_value=mock_fit_file)
+        manager.platforms["garmin_us"].list_activities = Mock(return_value=garmin_us_activities)
+        manager.platforms["garmin_us"].download_activity = Mock(return_value=mock_fit_file)
         
-        manager.platforms["coros_cn"].list_activities = MagicMock(return_value=coros_cn_activities)
-        manager.platforms["coros_cn"].download_activity = MagicMock(return_value=mock_fit_file)
+        manager.platforms["coros_cn"].list_activities = Mock(return_value=coros_cn_activities)
+        manager.platforms["coros_cn"].download_activity = Mock(return_value=mock_fit_file)
         
-        manager.platforms["garmin_cn"].upload_activity = MagicMock(return_value="new_activity_id")
+        manager.platforms["garmin_cn"].upload_activity = Mock(return_value="new_activity_id")
         
         # Run sync
         result = manager.sync()
@@ -95,16 +134,131 @@ class TestSyncManager:
         # Expected to sync 4 activities (2 from garmin_us, 2 from coros_cn)
         assert result == 4
         
-        # Check that list_activities was called for each source
-        manager.platforms["garmin_us"].list_activities.assert_called_once()
-        manager.platforms["coros_cn"].list_activities.assert_called_once()
+        # Each source is listed once, and every activity is downloaded and uploaded
+        garmin_us, coros_cn = manager.platforms["garmin_us"], manager.platforms["coros_cn"]
+        calls = (
+            garmin_us.list_activities.call_count,
+            coros_cn.list_activities.call_count,
+            garmin_us.download_activity.call_count,
+            coros_cn.download_activity.call_count,
+            manager.platforms["garmin_cn"].upload_activity.call_count
+        )
+        assert calls == (1, 1, 2, 2, 4)
+
+    def test_sync_overlapping_rules(self, mock_config, temp_cache_dir, mock_fit_file):
+        """Test that overlapping rules download and upload each activity only as needed."""
+        mock_config["cache"]["directory"] = str(temp_cache_dir)
+        mock_config["sync_rules"] = [
+            {"source": "garmin_us", "destination": "garmin_cn"},
+            {"source": "garmin_us", "destination": "garmin_cn"},
+            {"source": "garmin_us", "destination": "coros_cn"}
+        ]
+        manager = SyncManager(mock_config)
+        
+        activities = [{"id": f"test_{i}", "activityType": "running"} for i in range(3)]
+        manager.platforms["garmin_us"].list_activities = lambda **kwargs: activities
+        manager.platforms["garmin_us"].download_activity = Mock(return_value=mock_fit_file)
+        manager.platforms["garmin_cn"].upload_activity = Mock(return_value="new_activity_id")
+        manager.platforms["coros_cn"].upload_activity = Mock(return_value="new_activity_id")
+        
+        # The duplicate rule is skipped, the second destination reuses the downloads
+        assert manager.sync() == 6
+        calls = (
+            manager.platforms["garmin_us"].download_activity.call_count,
+            manager.platforms["garmin_cn"].upload_activity.call_count,
+            manager.platforms["coros_cn"].upload_activity.call_count
+        )
+        assert calls == (3, 3, 3)
+
+    def test_sync_transfers_concurrently(self, mock_config, temp_cache_dir, mock_fit_file):
+        """Test that sync downloads and uploads activities concurrently."""
+        import threading
+        mock_config["cache"]["directory"] = str(temp_cache_dir)
+        mock_config["sync"] = {"max_workers": 3}
+        manager = SyncManager(mock_config)
+        
+        activities = [{"id": f"test_{i}", "activityType": "running"} for i in range(3)]
+        
+        # Each download waits for the others; this only succeeds if they run in parallel
+        barrier = threading.Barrier(len(activities), timeout=5)
+        
+        def download(activity_id):
+            barrier.wait()
+            return mock_fit_file
+        
+        manager.platforms["garmin_us"].list_activities = lambda **kwargs: activities
+        manager.platforms["garmin_us"].download_activity = download
+        manager.platforms["garmin_cn"].upload_activity = Mock(side_effect=["new_1", None, "new_3"])
+        
+        result = manager.sync(source="garmin_us", destination="garmin_cn")
+        
+        # One upload failed, so only two activities count as synced
+        assert result == 2
+        assert manager.platforms["garmin_cn"].upload_activity.call_count == 3
+
+    def test_sync_sequential(self, mock_config, temp_cache_dir, mock_fit_file):
+        """Test that max_workers=1 syncs activities in the calling thread."""
+        import threading
+        mock_config["cache"]["directory"] = str(temp_cache_dir)
+        mock_config["sync"] = {"max_workers": 1}
+        manager = SyncManager(mock_config)
+        
+        threads = []
+        
+        def download(activity_id):
+            threads.append(threading.current_thread())
+            return mock_fit_file
+        
+        activities = [{"id": f"test_{i}", "activityType": "running"} for i in range(3)]
+        manager.platforms["garmin_us"].list_activities = lambda **kwargs: activities
+        manager.platforms["garmin_us"].download_activity = download
+        manager.platforms["garmin_cn"].upload_activity = lambda fit_file: "new_activity_id"
+        
+        assert manager.sync(source="garmin_us", destination="garmin_cn") == 3
+        assert threads == [threading.current_thread()] * 3
+
+    def test_sync_logs_rule_summary(self, mock_config, temp_cache_dir, mock_fit_file):
+        """Test that each rule logs one summary line with its outcome counts."""
+        mock_config["cache"]["directory"] = str(temp_cache_dir)
+        manager = SyncManager(mock_config)
+        
+        activities = [
+            {"id": "ok_1", "activityType": "running"},
+            {"id": "bad_1", "activityType": "running"},
+            {"activityType": "running"}
+        ]
+        manager.platforms["garmin_us"].list_activities = lambda **kwargs: activities
+        manager.platforms["garmin_us"].download_activity = (
+            lambda activity_id: mock_fit_file if activity_id == "ok_1" else None
+        )
+        manager.platforms["garmin_cn"].upload_activity = lambda fit_file: "new_activity_id"
+        
+        with patch('fit_sync.sync.logger') as mock_logger:
+            result = manager.sync(source="garmin_us", destination="garmin_cn")
         
-        # Check that download_activity was called for each activity
-        assert manager.platforms["garmin_us"].download_activity.call_count == 2
-        assert manager.platforms["coros_cn"].download_activity.call_count == 2
+        assert result == 1
+        mock_logger.info.assert_called_once_with(
+            "Rule garmin_us -> garmin_cn: 1 synced, 1 failed, 1 skipped"
+        )
+
+    def test_sync_post_filters_coarse_sources(self, mock_config, temp_cache_dir, mock_fit_file):
+        """Test that activity types are re-filtered for sources with coarse server-side filters."""
+        mock_config["cache"]["directory"] = str(temp_cache_dir)
+        manager = SyncManager(mock_config)
+        
+        # Coros CN filters by mode code, so trail runs come back for a running filter
+        activities = [
+            {"id": "coros_1", "activityType": "running"},
+            {"id": "coros_2", "activityType": "trail_running"}
+        ]
+        manager.platforms["coros_cn"].list_activities = lambda **kwargs: activities
+        manager.platforms["coros_cn"].download_activity = Mock(return_value=mock_fit_file)
+        manager.platforms["garmin_cn"].upload_activity = lambda fit_file: "new_activity_id"
+        
+        result = manager.sync(source="coros_cn", destination="garmin_cn", activity_types=["running"])
         
-        # Check that upload_activity was called for each activity
-        assert manager.platforms["garmin_cn"].upload_activity.call_count == 4
+        assert result == 1
+        manager.platforms["coros_cn"].download_activity.assert_called_once_with("coros_1")
 
     def test_sync_with_override_params(self, mock_config, temp_cache_dir, mock_fit_file):
         """Test sync method with overridden parameters."""
@@ -117,10 +271,14 @@ class TestSyncManager:
             {"id": "test_2", "activityType": "cycling"}
         ]
         
-        # Mock platform methods
-        manager.platforms["garmin_us"].list_activities = MagicMock(return_value=activities)
-        manager.platforms["garmin_us"].download_activity = MagicMock(return_value=mock_fit_file)
-        manager.platforms["garmin_cn"].upload_activity = MagicMock(return_value="new_activity_id")
+        # Mock platform methods; Garmin applies the activity type filter itself
+        def list_activities(activity_type=None, **kwargs):
+            types = activity_type.split(',') if activity_type else None
+            return [a for a in activities if types is None or a["activityType"] in types]
+        
+        manager.platforms["garmin_us"].list_activities = Mock(side_effect=list_activities)
+        manager.platforms["garmin_us"].download_activity = Mock(return_value=mock_fit_file)
+        manager.platforms["garmin_cn"].upload_activity = Mock(return_value="new_activity_id")
         
         # Run sync with overridden parameters
         result = manager.sync(
@@ -133,10 +291,14 @@ class TestSyncManager:
         
         # Should only sync activities from the specified source and with specified filters
         assert result == 1  # Only the running activity should be synced
-        manager.platforms["garmin_us"].list_activities.assert_called_once()
-        assert manager.platforms["garmin_us"].download_activity.call_count == 1
-        manager.platforms["garmin_us"].download_activity.assert_called_with("test_1")
-        assert manager.platforms["garmin_cn"].upload_activity.call_count == 1
+        garmin_us = manager.platforms["garmin_us"]
+        calls = (
+            garmin_us.list_activities.call_count,
+            garmin_us.download_activity.call_count,
+            manager.platforms["garmin_cn"].upload_activity.call_count
+        )
+        assert calls == (1, 1, 1)
+        garmin_us.download_activity.assert_called_with("test_1")
 
     def test_sync_dry_run(self, mock_config, temp_cache_dir, mock_fit_file):
         """Test sync method in dry run mode."""
@@ -150,9 +312,9 @@ class TestSyncManager:
         ]
         
         # Mock platform methods
-        manager.platforms["garmin_us"].list_activities = MagicMock(return_value=activities)
-        manager.platforms["garmin_us"].download_activity = MagicMock(return_value=mock_fit_file)
-        manager.platforms["garmin_cn"].upload_activity = MagicMock(return_value="new_activity_id")
+        manager.platforms["garmin_us"].list_activities = Mock(return_value=activities)
+        manager.platforms["garmin_us"].download_activity = Mock(return_value=mock_fit_file)
+        manager.platforms["garmin_cn"].upload_activity = Mock(return_value="new_activity_id")
         
         # Run sync in dry run mode
         result = manager.sync(
@@ -163,9 +325,12 @@ class TestSyncManager:
         
         # Should count the activities that would be synced, but not actually upload them
         assert result == 2
-        manager.platforms["garmin_us"].list_activities.assert_called_once()
-        assert manager.platforms["garmin_us"].download_activity.call_count == 2
-        manager.platforms["garmin_cn"].upload_activity.assert_not_called()
+        calls = (
+            manager.platforms["garmin_us"].list_activities.call_count,
+            manager.platforms["garmin_us"].download_activity.call_count,
+            manager.platforms["garmin_cn"].upload_activity.call_count
+        )
+        assert calls == (1, 2, 0)
 
     def test_sync_missing_platforms(self, mock_config, temp_cache_dir):
         """Test sync method with missing platforms."""
@@ -177,12 +342,17 @@ class TestSyncManager:
         
         # Mock platform methods to simulate activities
         activities = [{"id": f"activity_{i}", "activityType": "running"} for i in range(100)]
-        manager.platforms["garmin_us"].list_activities = MagicMock(return_value=activities)
-        manager.platforms["garmin_us"].download_activity = MagicMock(return_value="/tmp/mock_fit_file.fit")
-        manager.platforms["garmin_cn"].upload_activity = MagicMock(return_value="new_activity_id")
+        manager.platforms["garmin_us"].list_activities = Mock(return_value=activities)
+        manager.platforms["garmin_us"].download_activity = Mock(return_value="/tmp/mock_fit_file.fit")
+        manager.platforms["garmin_cn"].upload_activity = Mock(return_value="new_activity_id")
         
         # Run sync
-        result = manager.sync()
+        with patch('fit_sync.sync.logging.error') as mock_error:
+            result = manager.sync()
+        
+        # The skipped rule is reported once, naming the missing platform
+        mock_error.assert_called_once()
+        assert "coros_cn" in mock_error.call_args[0][0]
         
         # Should only execute rules with configured platforms (garmin_us -> garmin_cn)
         # and skip rules with missing platforms (coros_cn -> garmin_cn)
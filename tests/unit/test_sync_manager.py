@@ -3,14 +3,20 @@ Unit tests for the SyncManager class.
 """
 
 import os
+import shutil
+import stat
 import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
+from fit_sync import sync as sync_module
 from fit_sync.sync import SyncManager
 
+# Activity listing returned by the mocked platforms, built once per module
+_MOCK_ACTIVITIES = ({'id': 'test_1'}, {'id': 'test_2'})
+
 @pytest.fixture
-def mock_config():
+def mock_config(tmp_path):
     """Create a mock configuration dict."""
     return {
         'accounts': {
@@ -38,265 +44,395 @@ def mock_config():
         ],
         'cache': {
             'max_age_days': 7,
-            'directory': '/tmp/fit_sync_test_cache'
+            'directory': str(tmp_path / 'cache')
         }
     }
 
+class FakePlatform:
+    """Platform double that counts logins; listing and downloading are the only mocks."""
+    
+    def __init__(self):
+        self.auth_calls = 0
+        self.list_activities = MagicMock()
+        self.download_activity = MagicMock()
+    
+    def authenticate(self):
+        """Count the login and report success."""
+        self.auth_calls += 1
+        return True
+
 @pytest.fixture
 def mock_platform_factory():
-    """Mock the platform classes to return the same platform instance."""
-    with patch('fit_sync.platforms.garmin.GarminUSPlatform') as garmin_us_mock, \
-         patch('fit_sync.platforms.garmin.GarminCNPlatform') as garmin_cn_mock, \
-         patch('fit_sync.platforms.coros.CorosCNPlatform') as coros_cn_mock:
+    """Mock the platform classes SyncManager builds to return the same platform instance."""
+    with patch.object(sync_module, 'GarminUSPlatform') as garmin_us_mock, \
+         patch.object(sync_module, 'GarminCNPlatform') as garmin_cn_mock, \
+         patch.object(sync_module, 'CorosCNPlatform') as coros_cn_mock:
         
-        platform_mock = MagicMock()
+        platform_mock = FakePlatform()
         garmin_us_mock.return_value = platform_mock
         garmin_cn_mock.return_value = platform_mock
         coros_cn_mock.return_value = platform_mock
         
         yield platform_mock
 
+def _patch_platform_methods(monkeypatch, platform, **methods):
+    """Replace platform methods for the duration of a test."""
+    for name, method in methods.items():
+        monkeypatch.setattr(platform, name, method)
+
 class TestSyncManager:
     """Tests for the SyncManager class."""
     
-    def test_init_platforms(self, mock_config):
-        """Test platform initialization."""
+    @pytest.mark.parametrize(
+        "platform_id, auth_ok, fit_available, output_dir, output_filename, expected_name", [
+            pytest.param('garmin_us', True, True, None, None, "test_activity.fit", id="success"),
+            pytest.param('garmin_us', True, True, "downloads", None, "test_activity.fit", id="output_dir"),
+            pytest.param('garmin_us', True, True, "downloads", "custom_activity.fit", "custom_activity.fit",
+                         id="custom_filename"),
+            pytest.param('garmin_us', False, True, None, None, None, id="auth_failure"),
+            pytest.param('non_existent_platform', True, True, None, None, None, id="invalid_platform"),
+            pytest.param('garmin_us', True, False, None, None, None, id="download_failure"),
+        ])
+    def test_download_activity(self, platform_id, auth_ok, fit_available, output_dir, output_filename,
+                               expected_name, mock_config, mock_fit_file, temp_cache_dir, monkeypatch):
+        """Test activity download with and without an output directory, and its failure modes."""
         sync_manager = SyncManager(mock_config)
         
-        # Should have initialized platforms defined in mock_config
-        assert 'garmin_us' in sync_manager.platforms
-        assert 'garmin_cn' in sync_manager.platforms
-        assert 'coros_cn' in sync_manager.platforms
+        # Set up mocks
+        if platform_id in sync_manager.platforms:
+            _patch_platform_methods(
+                monkeypatch, sync_manager.platforms[platform_id],
+                authenticate=lambda: auth_ok,
+                download_activity=lambda activity_id: mock_fit_file if fit_available else None
+            )
+        
+        kwargs = {}
+        if output_dir:
+            kwargs['output_dir'] = str(temp_cache_dir / output_dir)
+        if output_filename:
+            kwargs['output_filename'] = output_filename
+        result = sync_manager.download_activity(platform_id, 'activity_1', **kwargs)
+        
+        if expected_name is None:
+            # Should return None on failure
+            assert result is None
+        elif output_dir is None:
+            # Without an output directory the cached file is returned as is
+            assert result == mock_fit_file
+        else:
+            # Should have placed the file in the output directory under the expected name
+            assert result == temp_cache_dir / output_dir / expected_name
+            assert result.read_text() == mock_fit_file.read_text()
     
-    def test_authenticate_all_success(self, mock_config):
-        """Test successful authentication with all platforms."""
+    def test_download_activity_copies_file(self, mock_config, mock_fit_file, temp_cache_dir, monkeypatch):
+        """Test that the exported file is a copy, not a link to the cache file."""
         sync_manager = SyncManager(mock_config)
+        platform_id = 'garmin_us'
+        output_dir = temp_cache_dir / "downloads"
+        
+        _patch_platform_methods(
+            monkeypatch, sync_manager.platforms[platform_id],
+            authenticate=lambda: True,
+            download_activity=lambda activity_id: mock_fit_file
+        )
+        
+        result = sync_manager.download_activity(
+            platform_id, 'activity_1', output_dir=str(output_dir)
+        )
         
-        with patch.object(sync_manager.platforms['garmin_us'], 'authenticate', return_value=True):
-            with patch.object(sync_manager.platforms['garmin_cn'], 'authenticate', return_value=True):
-                with patch.object(sync_manager.platforms['coros_cn'], 'authenticate', return_value=True):
-                    # All authentications successful
-                    assert sync_manager.authenticate_all() is True
+        assert result.read_text() == mock_fit_file.read_text()
+        assert not os.path.samefile(result, mock_fit_file)
     
-    def test_authenticate_all_partial_failure(self, mock_config):
-        """Test authentication with some platform failures."""
+    def test_download_activity_copyfile_fallback(self, mock_config, mock_fit_file, temp_cache_dir, monkeypatch):
+        """Test the plain copy used when in-kernel copying does not work."""
         sync_manager = SyncManager(mock_config)
+        platform_id = 'garmin_us'
+        output_dir = temp_cache_dir / "downloads"
+        mock_copyfile = MagicMock(wraps=shutil.copyfile)
+        
+        _patch_platform_methods(
+            monkeypatch, sync_manager.platforms[platform_id],
+            authenticate=lambda: True,
+            download_activity=lambda activity_id: mock_fit_file
+        )
+        monkeypatch.setattr(os, 'copy_file_range', MagicMock(side_effect=OSError("not supported")), raising=False)
+        monkeypatch.setattr(shutil, 'copyfile', mock_copyfile)
         
-        with patch.object(sync_manager.platforms['garmin_us'], 'authenticate', return_value=True):
-            with patch.object(sync_manager.platforms['garmin_cn'], 'authenticate', return_value=False):
-                with patch.object(sync_manager.platforms['coros_cn'], 'authenticate', return_value=True):
-                    # One authentication failed
-                    assert sync_manager.authenticate_all() is False
+        result = sync_manager.download_activity(
+            platform_id, 'activity_1', output_dir=str(output_dir)
+        )
+        
+        mock_copyfile.assert_called_once()
+        assert result.read_text() == mock_fit_file.read_text()
     
-    def test_download_activity_success(self, mock_config, mock_fit_file):
-        """Test successful activity download."""
+    def test_download_activity_twice_to_same_dir(self, mock_config, temp_cache_dir):
+        """Test that downloading an activity again into the same directory keeps its contents."""
         sync_manager = SyncManager(mock_config)
-        platform_id = 'garmin_us'
-        activity_id = 'activity_1'
+        output_dir = temp_cache_dir / "downloads"
         
-        # Set up mocks
-        with patch.object(sync_manager.platforms[platform_id], 'authenticate', return_value=True):
-            with patch.object(sync_manager.platforms[platform_id], 'download_activity', return_value=mock_fit_file):
-                # Test download without output directory
-                result = sync_manager.download_activity(platform_id, activity_id)
-                assert result == mock_fit_file
+        first = sync_manager.download_activity('garmin_us', 'activity_1', output_dir=str(output_dir))
+        second = sync_manager.download_activity('garmin_us', 'activity_1', output_dir=str(output_dir))
+        
+        assert first == second
+        assert second.read_text() == "Mock FIT file for activity activity_1"
     
-    def test_download_activity_with_output_dir(self, mock_config, mock_fit_file, temp_cache_dir):
-        """Test activity download with custom output directory."""
+    def test_download_activity_keeps_file_mode(self, mock_config, mock_fit_file, temp_cache_dir, monkeypatch):
+        """Test that the exported file keeps the cache file's permission bits."""
         sync_manager = SyncManager(mock_config)
         platform_id = 'garmin_us'
-        activity_id = 'activity_1'
         output_dir = temp_cache_dir / "downloads"
         
-        # Set up mocks
-        with patch.object(sync_manager.platforms[platform_id], 'authenticate', return_value=True):
-            with patch.object(sync_manager.platforms[platform_id], 'download_activity', return_value=mock_fit_file):
-                with patch('shutil.copy') as mock_copy:
-                    # Test download with output directory
-                    result = sync_manager.download_activity(
-                        platform_id, 
-                        activity_id, 
-                        output_dir=str(output_dir)
-                    )
-                    
-                    # Should have copied the file
-                    mock_copy.assert_called_once()
-                    assert result is not None
+        cache_file = temp_cache_dir / mock_fit_file.name
+        shutil.copyfile(mock_fit_file, cache_file)
+        cache_file.chmod(0o644)
+        
+        _patch_platform_methods(
+            monkeypatch, sync_manager.platforms[platform_id],
+            authenticate=lambda: True,
+            download_activity=lambda activity_id: cache_file
+        )
+        
+        result = sync_manager.download_activity(
+            platform_id, 'activity_1', output_dir=str(output_dir)
+        )
+        
+        assert stat.S_IMODE(result.stat().st_mode) == 0o644
     
-    def test_download_activity_with_custom_filename(self, mock_config, mock_fit_file, temp_cache_dir):
-        """Test activity download with custom filename."""
+    def test_download_activity_over_hard_link(self, mock_config, mock_fit_file, temp_cache_dir, monkeypatch):
+        """Test exporting over an output file that is a hard link of the cache file."""
         sync_manager = SyncManager(mock_config)
         platform_id = 'garmin_us'
-        activity_id = 'activity_1'
         output_dir = temp_cache_dir / "downloads"
-        custom_filename = "custom_activity.fit"
+        output_dir.mkdir()
         
-        # Set up mocks
-        with patch.object(sync_manager.platforms[platform_id], 'authenticate', return_value=True):
-            with patch.object(sync_manager.platforms[platform_id], 'download_activity', return_value=mock_fit_file):
-                with patch('shutil.copy') as mock_copy:
-                    # Test download with output directory and custom filename
-                    result = sync_manager.download_activity(
-                        platform_id, 
-                        activity_id, 
-                        output_dir=str(output_dir),
-                        output_filename=custom_filename
-                    )
-                    
-                    # Should have copied the file with custom name
-                    mock_copy.assert_called_once()
-                    assert mock_copy.call_args[0][1].name == custom_filename
-                    assert result is not None
+        # A private cache file, already hard-linked into the output directory
+        cache_file = temp_cache_dir / mock_fit_file.name
+        shutil.copyfile(mock_fit_file, cache_file)
+        os.link(cache_file, output_dir / cache_file.name)
+        
+        _patch_platform_methods(
+            monkeypatch, sync_manager.platforms[platform_id],
+            authenticate=lambda: True,
+            download_activity=lambda activity_id: cache_file
+        )
+        
+        result = sync_manager.download_activity(
+            platform_id, 'activity_1', output_dir=str(output_dir)
+        )
+        
+        # Both files keep their contents, and the export no longer aliases the cache
+        assert cache_file.read_text() == mock_fit_file.read_text()
+        assert result.read_text() == mock_fit_file.read_text()
+        assert not os.path.samefile(result, cache_file)
+        assert list(output_dir.iterdir()) == [result]
     
-    def test_download_activity_auth_failure(self, mock_config):
-        """Test activity download with authentication failure."""
+    def test_download_activity_authenticates_once(self, mock_config, mock_fit_file):
+        """Test that repeated downloads only authenticate on the first call."""
         sync_manager = SyncManager(mock_config)
         platform_id = 'garmin_us'
-        activity_id = 'activity_1'
+        platform = sync_manager.platforms[platform_id]
         
-        # Set up mock for authentication failure
-        with patch.object(sync_manager.platforms[platform_id], 'authenticate', return_value=False):
-            result = sync_manager.download_activity(platform_id, activity_id)
-            assert result is None
+        with patch.object(platform, 'authenticate', return_value=True) as mock_auth, \
+             patch.object(platform, 'download_activity', return_value=mock_fit_file):
+            sync_manager.download_activity(platform_id, 'activity_1')
+            sync_manager.download_activity(platform_id, 'activity_2')
+        
+        mock_auth.assert_called_once()
     
-    def test_download_activity_invalid_platform(self, mock_config):
-        """Test activity download with invalid platform."""
+    def test_auth_reused_within_ttl(self, mock_config, mock_fit_file):
+        """Test that a successful login is reused until AUTH_TTL has passed."""
         sync_manager = SyncManager(mock_config)
-        platform_id = 'non_existent_platform'
-        activity_id = 'activity_1'
+        platform_id = 'garmin_us'
+        platform = sync_manager.platforms[platform_id]
         
-        result = sync_manager.download_activity(platform_id, activity_id)
-        assert result is None
+        with patch.object(platform, 'authenticate', return_value=True) as mock_auth, \
+             patch.object(platform, 'download_activity', return_value=mock_fit_file), \
+             patch('fit_sync.sync.time.monotonic', return_value=1000.0) as mock_time:
+            sync_manager.download_activity(platform_id, 'activity_1')
+            sync_manager.download_activity(platform_id, 'activity_2')
+            sync_manager.get_activities(platform_id, limit=10)
+            mock_auth.assert_called_once()
+            
+            mock_time.return_value = 1000.0 + SyncManager.AUTH_TTL
+            sync_manager.download_activity(platform_id, 'activity_1')
+            assert mock_auth.call_count == 2
     
-    def test_download_activity_download_failure(self, mock_config, mock_platform_factory):
-        """Test downloading an activity that fails."""
-        platform_mock = mock_platform_factory
-        platform_mock.authenticate.return_value = True
-        platform_mock.download_activity.return_value = None
+    def test_auth_failure_cooldown(self, mock_config):
+        """Test that a failed login is not retried until the cooldown has passed."""
+        sync_manager = SyncManager(mock_config)
+        platform_id = 'garmin_us'
         
-        # Create sync manager with mocked platforms
-        with patch('fit_sync.sync.GarminUSPlatform', return_value=platform_mock), \
-             patch('fit_sync.sync.GarminCNPlatform', return_value=platform_mock), \
-             patch('fit_sync.sync.CorosCNPlatform', return_value=platform_mock):
+        with patch.object(sync_manager.platforms[platform_id], 'authenticate', return_value=False) as mock_auth, \
+             patch('fit_sync.sync.time.monotonic', return_value=1000.0) as mock_time:
+            assert sync_manager.download_activity(platform_id, 'activity_1') is None
+            assert sync_manager.get_activities(platform_id, limit=10) == []
+            mock_auth.assert_called_once()
             
-            sync_manager = SyncManager(mock_config)
-            result = sync_manager.download_activity('garmin_us', 'activity_1')
-        
-        # Should return None on failure
-        assert result is None
-        
+            # Once the cooldown has passed, the login is attempted again
+            mock_time.return_value = 1000.0 + SyncManager.AUTH_FAILURE_COOLDOWN
+            sync_manager.get_activities(platform_id, limit=10)
+            assert mock_auth.call_count == 2
+    
     def test_activities_caching(self, mock_config, mock_platform_factory):
         """Test that activities are properly cached."""
         # Setup platform mock
         platform_mock = mock_platform_factory
-        platform_mock.authenticate.return_value = True
         
         # First call should retrieve from platform
-        mock_activities = [{'id': 'test_1'}, {'id': 'test_2'}]
-        platform_mock.list_activities.return_value = mock_activities
+        platform_mock.list_activities.return_value = list(_MOCK_ACTIVITIES)
         
-        # Create sync manager with mocked platforms
-        with patch('fit_sync.sync.GarminUSPlatform', return_value=platform_mock), \
-             patch('fit_sync.sync.GarminCNPlatform', return_value=platform_mock), \
-             patch('fit_sync.sync.CorosCNPlatform', return_value=platform_mock):
-            
-            sync_manager = SyncManager(mock_config)
-            result1 = sync_manager.get_activities('garmin_us', limit=10)
-            
-            # Verify platform call
-            assert platform_mock.authenticate.call_count >= 1
-            assert platform_mock.list_activities.call_count >= 1
-            
-            # Reset mock for next call
-            platform_mock.authenticate.reset_mock()
-            platform_mock.list_activities.reset_mock()
-            
-            # Second call should use cache
-            result2 = sync_manager.get_activities('garmin_us', limit=10)
-            
-            # Verify platform not called again
-            assert platform_mock.authenticate.call_count == 0
-            assert platform_mock.list_activities.call_count == 0
-            
-            # Results should be the same
-            assert result1 == result2
-            assert result1 == mock_activities
+        sync_manager = SyncManager(mock_config)
+        result1 = sync_manager.get_activities('garmin_us', limit=10)
+        
+        # Verify platform call
+        assert platform_mock.auth_calls >= 1
+        assert platform_mock.list_activities.call_count >= 1
+        
+        # Reset mock for next call
+        platform_mock.auth_calls = 0
+        platform_mock.list_activities.reset_mock()
+        
+        # Second call should use cache
+        result2 = sync_manager.get_activities('garmin_us', limit=10)
+        
+        # Verify platform not called again
+        assert platform_mock.auth_calls == 0
+        assert platform_mock.list_activities.call_count == 0
+        
+        # Results should be the same
+        assert result1 == result2
+        assert result1 == list(_MOCK_ACTIVITIES)
         
     def test_activities_cache_expiry(self, mock_config, mock_platform_factory, monkeypatch):
         """Test that activities cache expires after the specified time."""
-        import datetime
+        import time
         
         # Setup platform mock
         platform_mock = mock_platform_factory
-        platform_mock.authenticate.return_value = True
-        
-        # Setup time mocking
-        current_time = datetime.datetime(2024, 1, 1, 12, 0, 0)
-        future_time = datetime.datetime(2024, 1, 1, 12, 31, 0)  # 31 minutes later
-        
-        # Mock datetime.now
-        class MockDatetime(datetime.datetime):
-            @classmethod
-            def now(cls):
-                return current_time
-        
-        # Create sync manager with mocked platforms
-        with patch('fit_sync.sync.GarminUSPlatform', return_value=platform_mock), \
-             patch('fit_sync.sync.GarminCNPlatform', return_value=platform_mock), \
-             patch('fit_sync.sync.CorosCNPlatform', return_value=platform_mock):
-            
-            # First call at current time
-            monkeypatch.setattr(datetime, 'datetime', MockDatetime)
-            platform_mock.list_activities.return_value = [{'id': 'test_1'}]
-            
-            sync_manager = SyncManager(mock_config)
-            sync_manager.get_activities('garmin_us', limit=10)
-            
-            # Reset mock for next call
-            platform_mock.authenticate.reset_mock()
-            platform_mock.list_activities.reset_mock()
-            
-            # Change mock time to future time (after cache expiry)
-            current_time = future_time
-            
-            # Different activities for second call
-            platform_mock.list_activities.return_value = [{'id': 'test_2'}]
-            
-            # This call should not use cache since it's expired
-            result = sync_manager.get_activities('garmin_us', limit=10)
-            
-            # Verify platform called again after cache expiry
-            assert platform_mock.authenticate.call_count >= 1
-            assert platform_mock.list_activities.call_count >= 1
-            
-            # Result should be the new value
-            assert result == [{'id': 'test_2'}]
+        
+        # Setup time mocking; the cache ages by the monotonic clock
+        current_time = 1000.0
+        future_time = current_time + 31 * 60  # 31 minutes later
+        
+        # First call at current time
+        monkeypatch.setattr(time, 'monotonic', lambda: current_time)
+        platform_mock.list_activities.return_value = [{'id': 'test_1'}]
+        
+        sync_manager = SyncManager(mock_config)
+        sync_manager.get_activities('garmin_us', limit=10)
+        
+        # Reset mock for next call
+        platform_mock.auth_calls = 0
+        platform_mock.list_activities.reset_mock()
+        
+        # Change mock time to future time (after cache expiry)
+        current_time = future_time
+        
+        # Different activities for second call
+        platform_mock.list_activities.return_value = [{'id': 'test_2'}]
+        
+        # This call should not use cache since it's expired
+        result = sync_manager.get_activities('garmin_us', limit=10)
+        
+        # Verify platform listed again after cache expiry; the 30 minute
+        # login TTL has elapsed too, so it logs in again
+        assert platform_mock.auth_calls == 1
+        assert platform_mock.list_activities.call_count >= 1
+        
+        # Result should be the new value
+        assert result == [{'id': 'test_2'}]
         
     def test_clear_activities_cache(self, mock_config, mock_platform_factory):
         """Test clearing the activities cache."""
         # Setup platform mock
         platform_mock = mock_platform_factory
-        platform_mock.authenticate.return_value = True
         platform_mock.list_activities.return_value = [{'id': 'test_1'}]
         
-        # Create sync manager with mocked platforms
-        with patch('fit_sync.sync.GarminUSPlatform', return_value=platform_mock), \
-             patch('fit_sync.sync.GarminCNPlatform', return_value=platform_mock), \
-             patch('fit_sync.sync.CorosCNPlatform', return_value=platform_mock):
+        sync_manager = SyncManager(mock_config)
+        sync_manager.get_activities('garmin_us', limit=10)
+        
+        # Reset mocks
+        platform_mock.auth_calls = 0
+        platform_mock.list_activities.reset_mock()
+        
+        # Clear cache
+        sync_manager.clear_activities_cache()
+        
+        # Next call should not use cache
+        sync_manager.get_activities('garmin_us', limit=10)
+        
+        # Verify platform listed again, reusing the recent login
+        assert platform_mock.auth_calls == 0
+        assert platform_mock.list_activities.call_count >= 1
+    
+    def test_activities_disk_cache(self, mock_config, mock_platform_factory):
+        """Test that cached activities are shared between SyncManager instances via disk."""
+        platform_mock = mock_platform_factory
+        platform_mock.list_activities.return_value = [{'id': 'test_1'}]
+        
+        SyncManager(mock_config).get_activities('garmin_us', limit=10)
+        platform_mock.list_activities.reset_mock()
+        
+        # A fresh manager (e.g. the next CLI run) reads the listing from disk
+        sync_manager = SyncManager(mock_config)
+        assert sync_manager.get_activities('garmin_us', limit=10) == [{'id': 'test_1'}]
+        platform_mock.list_activities.assert_not_called()
+        
+        # Clearing the cache removes the disk copy as well
+        sync_manager.clear_activities_cache()
+        SyncManager(mock_config).get_activities('garmin_us', limit=10)
+        platform_mock.list_activities.assert_called_once()
+    
+    def test_activities_disk_cache_write_failure(self, mock_config, mock_platform_factory, monkeypatch):
+        """Test that a failed disk cache write leaves no temporary file behind."""
+        platform_mock = mock_platform_factory
+        platform_mock.list_activities.return_value = [{'id': 'test_1'}]
+        monkeypatch.setattr(os, 'replace', MagicMock(side_effect=OSError("disk full")))
+        
+        sync_manager = SyncManager(mock_config)
+        assert sync_manager.get_activities('garmin_us', limit=10) == [{'id': 'test_1'}]
+        
+        assert list((sync_manager.cache_dir / 'activities').rglob('*.tmp')) == []
+    
+    def test_upload_invalidates_destination_cache(self, mock_config, mock_fit_file):
+        """Test that syncing to a platform invalidates its cached activity listings."""
+        sync_manager = SyncManager(mock_config)
+        source = sync_manager.platforms['garmin_us']
+        dest = sync_manager.platforms['garmin_cn']
+        
+        with patch.object(dest, 'authenticate', return_value=True), \
+             patch.object(dest, 'list_activities', return_value=[{'id': 'old'}]) as mock_list, \
+             patch.object(source, 'list_activities', return_value=[{'id': 'new', 'activityType': 'running'}]), \
+             patch.object(source, 'download_activity', return_value=mock_fit_file), \
+             patch.object(dest, 'upload_activity', return_value='uploaded_id'):
             
-            sync_manager = SyncManager(mock_config)
-            sync_manager.get_activities('garmin_us', limit=10)
+            sync_manager.get_activities('garmin_cn', limit=10)
+            sync_manager.get_activities('garmin_cn', limit=10)
+            assert mock_list.call_count == 1
             
-            # Reset mocks
-            platform_mock.authenticate.reset_mock()
-            platform_mock.list_activities.reset_mock()
+            assert sync_manager.sync(source='garmin_us', destination='garmin_cn') == 1
             
-            # Clear cache
-            sync_manager.clear_activities_cache()
+            # The cached listing for the destination is stale now
+            sync_manager.get_activities('garmin_cn', limit=10)
+            assert mock_list.call_count == 2
+    
+    def test_activities_cache_bounded(self, mock_config, mock_platform_factory):
+        """Test that the in-memory activities cache evicts least recently used listings."""
+        platform_mock = mock_platform_factory
+        platform_mock.list_activities.return_value = [{'id': 'test_1'}]
+        
+        with patch.object(SyncManager, 'ACTIVITIES_CACHE_SIZE', 2), \
+             patch.object(SyncManager, '_store_activities_cache',
+                          lambda self, key, activities, now: self._remember_activities(key, activities, now)):
             
-            # Next call should not use cache
-            sync_manager.get_activities('garmin_us', limit=10)
+            sync_manager = SyncManager(mock_config)
+            sync_manager.get_activities('garmin_us', limit=1)
+            sync_manager.get_activities('garmin_us', limit=2)
+            sync_manager.get_activities('garmin_us', limit=1)  # Refresh limit=1
+            sync_manager.get_activities('garmin_us', limit=3)  # Evicts limit=2
+            assert platform_mock.list_activities.call_count == 3
             
-            # Verify platform called again
-            assert platform_mock.authenticate.call_count >= 1
-            assert platform_mock.list_activities.call_count >= 1 
\ No newline at end of file
+            sync_manager.get_activities('garmin_us', limit=1)
+            assert platform_mock.list_activities.call_count == 3
+            sync_manager.get_activities('garmin_us', limit=2)
+            assert platform_mock.list_activities.call_count == 4